@@ -0,0 +1,43 @@
+"""
+Debating agents: LLM personas taking turns in a simulated dialogue.
+
+Importing the package loads no model, console or speech backend;
+ChatOpenAI, rich and elevenlabs are imported the first time they are used.
+"""
+
+from autodebate.agents import DialogueAgent
+from autodebate.context import ContextPolicy
+from autodebate.dataset import DatasetWriter
+from autodebate.instrumentation import Instrumentation
+from autodebate.llm_cache import ResponseCache
+from autodebate.scenario import (
+    Scenario,
+    ScenarioSetup,
+    agenerate_setup,
+    asetup,
+    build_simulator,
+    generate_character_description,
+)
+from autodebate.setup_cache import SetupCache
+from autodebate.simulator import DialogueSimulator, Turn
+from autodebate.transcript import Transcript
+from autodebate.verifier import LinearSystemVerifier
+
+__all__ = [
+    "ContextPolicy",
+    "DatasetWriter",
+    "DialogueAgent",
+    "DialogueSimulator",
+    "Instrumentation",
+    "LinearSystemVerifier",
+    "ResponseCache",
+    "Scenario",
+    "ScenarioSetup",
+    "SetupCache",
+    "Transcript",
+    "Turn",
+    "agenerate_setup",
+    "asetup",
+    "build_simulator",
+    "generate_character_description",
+]
@@ -0,0 +1,3 @@
+from autodebate.cli import main
+
+main()
@@ -0,0 +1,241 @@
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from autodebate.context import ContextPolicy
+from autodebate.guards import OutputGuard
+from autodebate.instrumentation import Instrumentation
+from autodebate.llm import ainvoke, astream, invoke, stream
+from autodebate.llm_cache import ResponseCache
+from autodebate.routing import RoutingPolicy
+from autodebate.transcript import Transcript
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+class DialogueAgent:
+    def __init__(
+        self,
+        name: str,
+        system_message: SystemMessage,
+        model: "BaseChatModel",
+        transcript: Optional[Transcript] = None,
+        context_policy: Optional[ContextPolicy] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        cache: Optional[ResponseCache] = None,
+        routing: Optional[RoutingPolicy] = None,
+        guard: Optional[OutputGuard] = None,
+    ) -> None:
+        self.name = name
+        self.system_message = system_message
+        self.model = model
+        self.context_policy = context_policy
+        self.instrumentation = instrumentation
+        self.cache = cache
+        self.routing = routing
+        self.guard = guard
+        # the model that answered the last turn, the strong one when routing escalated it
+        self.last_model: Optional["BaseChatModel"] = None
+        self.prefix = f"{self.name}: "
+        self.transcript = transcript if transcript is not None else Transcript()
+        self.reset()
+
+    header = "Here is the conversation so far."
+
+    def reset(self):
+        # the agent only sees what is said from now on
+        self.cursor = len(self.transcript)
+        # transcript lines before this index live in the summary
+        self.summarized = self.cursor
+        self.summary = ""
+        # whether the last reply went on as another speaker, guarded or not
+        self.spoke_as_other = False
+
+    @property
+    def message_history(self) -> List[str]:
+        """
+        The agent's view of the transcript, starting at its cursor
+        """
+        return [self.header] + self.transcript.lines[self.cursor:]
+
+    def render(self) -> str:
+        """
+        Renders the message history followed by the agent's prefix,
+        reusing the transcript's text instead of re-joining every turn
+        """
+        summary = f"Summary of the earlier conversation: {self.summary}\n" if self.summary else ""
+        return f"{self.header}\n{summary}{self.transcript.render(self.summarized)}{self.prefix}"
+
+    def route(self) -> "BaseChatModel":
+        """
+        The model of the next turn: the routing policy's strong model
+        when one of its triggers fires, otherwise the agent's own
+        """
+        self.last_model = self.model
+        if self.routing is not None:
+            trigger = self.routing.trigger(self)
+            if trigger is not None:
+                self.count(f"escalation_{trigger}")
+                self.last_model = self.routing.strong
+        return self.last_model
+
+    def count(self, event: str) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.count(self.name, event)
+
+    def check_length(self, message) -> None:
+        if (getattr(message, "response_metadata", None) or {}).get("finish_reason") == "length":
+            self.count("guard_max_tokens")
+
+    def guarded(self, text: str) -> str:
+        """
+        Returns {text} once the output guard had its say,
+        counting every time it stepped in
+        """
+        trimmed = self.guard.trim(text)
+        self.spoke_as_other = trimmed is not None
+        if trimmed is None:
+            return text
+        self.count("guard_role_trim")
+        return trimmed
+
+    def summarize(self) -> None:
+        """
+        Folds the turns older than the policy's window into the summary
+        """
+        end = len(self.transcript) - self.context_policy.keep_last
+        model = self.context_policy.model or self.model
+        self.summary = invoke(
+            model, self.context_policy.summary_prompt(self, end), self.instrumentation, f"{self.name} (summary)", self.cache
+        ).content
+        self.summarized = end
+
+    async def asummarize(self) -> None:
+        end = len(self.transcript) - self.context_policy.keep_last
+        model = self.context_policy.model or self.model
+        message = await ainvoke(
+            model, self.context_policy.summary_prompt(self, end), self.instrumentation, f"{self.name} (summary)", self.cache
+        )
+        self.summary = message.content
+        self.summarized = end
+
+    def send(self) -> str:
+        """
+        Applies the chatmodel to the message history
+        and returns the message string
+        """
+        if self.context_policy is not None and self.context_policy.due(self):
+            self.summarize()
+        message = invoke(
+            self.route(),
+            [
+                self.system_message,
+                HumanMessage(content=self.render()),
+            ],
+            self.instrumentation,
+            self.name,
+            self.cache,
+        )
+        if self.guard is None:
+            return message.content
+        self.check_length(message)
+        return self.guarded(message.content)
+
+    async def asend(self) -> str:
+        """
+        Same as send, but awaits the chatmodel
+        so the event loop can drive other agents meanwhile
+        """
+        if self.context_policy is not None and self.context_policy.due(self):
+            await self.asummarize()
+        message = await ainvoke(
+            self.route(),
+            [
+                self.system_message,
+                HumanMessage(content=self.render()),
+            ],
+            self.instrumentation,
+            self.name,
+            self.cache,
+        )
+        if self.guard is None:
+            return message.content
+        self.check_length(message)
+        return self.guarded(message.content)
+
+    def send_stream(self) -> Iterator[str]:
+        """
+        Same as send, but yields the message piece by piece as it is generated
+        """
+        if self.context_policy is not None and self.context_policy.due(self):
+            self.summarize()
+        tokens = stream(
+            self.route(),
+            [
+                self.system_message,
+                HumanMessage(content=self.render()),
+            ],
+            self.instrumentation,
+            self.name,
+            self.cache,
+            on_message=self.check_length if self.guard is not None else None,
+        )
+        if self.guard is None:
+            yield from tokens
+            return
+        # the text is held back while it could still turn into another speaker
+        text, start, shown, cut = "", 0, 0, False
+        for token in tokens:
+            text += token
+            if cut:
+                # drained so the call completes and is recorded, not shown
+                continue
+            start, end, cut = self.guard.visible(text)
+            # a leading role tag is never shown
+            shown = max(shown, start)
+            if end > shown:
+                yield text[shown:end]
+                shown = end
+        rest = self.guarded(text)[shown - start :]
+        if rest:
+            yield rest
+
+    async def asend_stream(self) -> AsyncIterator[str]:
+        if self.context_policy is not None and self.context_policy.due(self):
+            await self.asummarize()
+        tokens = astream(
+            self.route(),
+            [
+                self.system_message,
+                HumanMessage(content=self.render()),
+            ],
+            self.instrumentation,
+            self.name,
+            self.cache,
+            on_message=self.check_length if self.guard is not None else None,
+        )
+        if self.guard is None:
+            async for token in tokens:
+                yield token
+            return
+        text, start, shown, cut = "", 0, 0, False
+        async for token in tokens:
+            text += token
+            if cut:
+                continue
+            start, end, cut = self.guard.visible(text)
+            shown = max(shown, start)
+            if end > shown:
+                yield text[shown:end]
+                shown = end
+        rest = self.guarded(text)[shown - start :]
+        if rest:
+            yield rest
+
+    def receive(self, name: str, message: str) -> None:
+        """
+        Concatenates {message} spoken by {name} into the transcript.
+        Agents of a simulator share one transcript, so everyone sees it.
+        """
+        self.transcript.append(name, message)
@@ -0,0 +1,148 @@
+"""
+Content-addressed cache of synthesized speech.
+
+Clips are stored as files named after a hash of (voice id, normalized
+text, synthesis settings), so replaying a debate makes no synthesis
+calls. Every hit refreshes the file's modification time and the least
+recently used clips are deleted once the directory outgrows its size cap.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from autodebate.voice import split_sentences, synthesize_elevenlabs
+
+
+def normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class AudioCache:
+    def __init__(
+        self,
+        directory: str = ".audio_cache",
+        max_bytes: int = 512 * 1024 * 1024,
+        settings: Optional[dict] = None,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # passed to the synthesizer and part of every key
+        self.settings = settings or {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def key(self, voice_id: str, text: str) -> str:
+        payload = json.dumps([voice_id, normalize(text), self.settings], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def get(self, voice_id: str, text: str) -> Optional[bytes]:
+        path = self.path(self.key(voice_id, text))
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        # refresh its place in the LRU order
+        now = time.time()
+        os.utime(path, (now, now))
+        with self._lock:
+            self.hits += 1
+        return audio
+
+    def put(self, voice_id: str, text: str, audio: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, self.path(self.key(voice_id, text)))
+        with self._lock:
+            self._size += len(audio)
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Deletes the least recently used clips until the cache is
+        back under 90% of {max_bytes}
+        """
+        with self._lock:
+            entries = sorted(
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(".audio")
+            )
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for _, entry_size, path in entries:
+                if size <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+            self._size = size
+
+    def synthesize(
+        self,
+        voice_id: str,
+        text: str,
+        synthesize: Callable[..., bytes] = synthesize_elevenlabs,
+    ) -> bytes:
+        """
+        Returns the cached clip, synthesizing and storing it on a miss
+        """
+        audio = self.get(voice_id, text)
+        if audio is None:
+            audio = synthesize(voice_id, text, **self.settings)
+            self.put(voice_id, text, audio)
+        return audio
+
+    def wrap(self, synthesize: Callable[..., bytes] = synthesize_elevenlabs) -> Callable[[str, str], bytes]:
+        """
+        Turns {synthesize} into a cached synthesizer, e.g. for VoicePipeline
+        """
+        return lambda voice_id, text: self.synthesize(voice_id, text, synthesize)
+
+    def prewarm(
+        self,
+        voice_map: Dict[str, str],
+        transcript: Iterable[Tuple[str, str]],
+        synthesize: Callable[..., bytes] = synthesize_elevenlabs,
+        max_workers: int = 4,
+    ) -> int:
+        """
+        Synthesizes every sentence of the (name, message) pairs in
+        {transcript} that is not cached yet, split the same way as
+        VoicePipeline splits them. Returns the number of synthesis calls.
+        """
+        missing = {}
+        for name, message in transcript:
+            voice_id = voice_map.get(name)
+            if voice_id is None:
+                continue
+            for sentence in split_sentences(message):
+                sentence = sentence.strip()
+                if sentence and not os.path.exists(self.path(self.key(voice_id, sentence))):
+                    missing[self.key(voice_id, sentence)] = (voice_id, sentence)
+
+        def fill(voice_id: str, sentence: str) -> None:
+            self.put(voice_id, sentence, synthesize(voice_id, sentence, **self.settings))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda item: fill(*item), missing.values()))
+        return len(missing)
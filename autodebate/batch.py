@@ -0,0 +1,290 @@
+"""
+Batch runner: many episodes of a scenario in one process.
+
+Episodes run concurrently on one event loop, at most {concurrency} at a
+time. The setup is generated once per distinct problem and shared by its
+episodes. Finished episodes stream into an optional DatasetWriter, and
+progress and throughput are reported as they complete.
+"""
+
+import asyncio
+import json
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from autodebate.dataset import DatasetWriter
+from autodebate.instrumentation import Instrumentation
+from autodebate.llm_cache import ResponseCache
+from autodebate.scenario import Scenario, ScenarioSetup, agenerate_setup, build_simulator
+from autodebate.scenarios import load_scenario
+from autodebate.setup_cache import SetupCache
+
+# a problem is a quest, or a dict of scenario settings such as {"quest": ..., "unknown": "c"}
+Problem = Union[str, dict]
+
+
+@dataclass
+class EpisodeResult:
+    index: int
+    problem: Optional[Problem]
+    turns: int = 0
+    verified: Optional[bool] = None
+    wall_time: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchStats:
+    total: int
+    started: float = field(default_factory=time.perf_counter)
+    completed: int = 0
+    failed: int = 0
+    verified: int = 0
+    turns: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def episodes_per_minute(self) -> float:
+        return (self.completed + self.failed) / self.elapsed * 60 if self.elapsed else 0.0
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.elapsed if self.elapsed else 0.0
+
+    def add(self, result: EpisodeResult) -> None:
+        if result.error is None:
+            self.completed += 1
+            self.turns += result.turns
+            self.verified += bool(result.verified)
+        else:
+            self.failed += 1
+
+    def __str__(self) -> str:
+        return (
+            f"{self.completed + self.failed}/{self.total} episodes, {self.failed} failed, "
+            f"{self.verified} verified, {self.episodes_per_minute:.1f} episodes/min, "
+            f"{self.turns_per_second:.1f} turns/s"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "verified": self.verified,
+            "turns": self.turns,
+            "elapsed": self.elapsed,
+            "episodes_per_minute": self.episodes_per_minute,
+            "turns_per_second": self.turns_per_second,
+        }
+
+
+@dataclass
+class BatchReport:
+    stats: BatchStats
+    episodes: List[EpisodeResult]
+
+    @property
+    def failures(self) -> List[EpisodeResult]:
+        return [episode for episode in self.episodes if episode.error is not None]
+
+
+def load_problems(path: str) -> List[Problem]:
+    """
+    Reads one problem per line: a quest, or a JSON object of settings
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [json.loads(line) if line.startswith("{") else line for line in lines if line]
+
+
+def settings_of(problem: Optional[Problem]) -> dict:
+    if problem is None:
+        return {}
+    return {"quest": problem} if isinstance(problem, str) else dict(problem)
+
+
+# (episode index, problem index, problem)
+Job = Tuple[int, int, Optional[Problem]]
+
+
+def plan(episodes: int = 1, problems: Optional[List[Problem]] = None, first_index: int = 0) -> List[Job]:
+    """
+    Lists {episodes} episodes for every problem of {problems},
+    or of the scenario's own quest, numbered from {first_index}
+    """
+    pairs = [(problem_index, problem) for problem_index, problem in enumerate(problems or [None]) for _ in range(episodes)]
+    return [(first_index + i, problem_index, problem) for i, (problem_index, problem) in enumerate(pairs)]
+
+
+def scenario_for(scenario_name: str, problem: Optional[Problem], settings: Optional[dict] = None) -> Scenario:
+    return load_scenario(scenario_name, **(settings or {}), **settings_of(problem))
+
+
+async def agenerate_setups(
+    scenario_name: str,
+    jobs: List[Job],
+    settings: Optional[dict] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+    setup_cache: Optional[SetupCache] = None,
+) -> Dict[int, ScenarioSetup]:
+    """
+    Generates the setup of every problem of {jobs} once, concurrently
+    """
+    problems = {problem_index: problem for _, problem_index, problem in jobs}
+    setups = await asyncio.gather(
+        *[
+            agenerate_setup(
+                scenario_for(scenario_name, problem, settings),
+                instrumentation=instrumentation,
+                cache=cache,
+                setup_cache=setup_cache,
+            )
+            for problem in problems.values()
+        ]
+    )
+    return dict(zip(problems, setups))
+
+
+async def arun_episode(
+    result: EpisodeResult,
+    scenario_name: str,
+    setup: Callable[[], Awaitable[ScenarioSetup]],
+    max_iters: Optional[int] = None,
+    settings: Optional[dict] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+    dataset: Optional[DatasetWriter] = None,
+    **metadata,
+) -> EpisodeResult:
+    """
+    Runs the episode of {result} on the setup awaited from {setup} and
+    fills {result} in, a failure is recorded there instead of raised.
+    {metadata} is added to its dataset record.
+    """
+    started = time.perf_counter()
+    try:
+        scenario = scenario_for(scenario_name, result.problem, settings)
+        simulator = build_simulator(scenario, await setup(), instrumentation, cache)
+        iters = scenario.max_iters if max_iters is None else max_iters
+        # like the CLI, steps 0 to max_iters
+        spoken = await simulator.arun(iters + 1)
+        result.turns = len(spoken)
+        result.verified = simulator.verified_step is not None if simulator.verifier is not None else None
+        if dataset is not None:
+            # fsyncs, keep it off the event loop
+            await asyncio.to_thread(
+                dataset.write_episode,
+                simulator,
+                scenario=scenario.name,
+                episode=result.index,
+                problem=result.problem,
+                **metadata,
+            )
+    except Exception:
+        result.error = traceback.format_exc()
+    result.wall_time = time.perf_counter() - started
+    return result
+
+
+async def arun_batch(
+    scenario_name: str,
+    episodes: int = 1,
+    problems: Optional[List[Problem]] = None,
+    concurrency: int = 8,
+    max_iters: Optional[int] = None,
+    settings: Optional[dict] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+    setup_cache: Optional[SetupCache] = None,
+    dataset: Optional[DatasetWriter] = None,
+    progress: Optional[Callable[[BatchStats], None]] = None,
+    first_index: int = 0,
+) -> BatchReport:
+    """
+    Runs {episodes} episodes of {scenario_name} for every problem of
+    {problems} (or of the scenario's own quest), numbered from
+    {first_index}. A failed episode is reported, not raised.
+    """
+    return await arun_jobs(
+        scenario_name,
+        plan(episodes, problems, first_index),
+        concurrency,
+        max_iters,
+        settings,
+        instrumentation,
+        cache,
+        setup_cache,
+        dataset,
+        progress,
+    )
+
+
+async def arun_jobs(
+    scenario_name: str,
+    jobs: List[Job],
+    concurrency: int = 8,
+    max_iters: Optional[int] = None,
+    settings: Optional[dict] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+    setup_cache: Optional[SetupCache] = None,
+    dataset: Optional[DatasetWriter] = None,
+    progress: Optional[Callable[[BatchStats], None]] = None,
+    setups: Optional[Dict[int, ScenarioSetup]] = None,
+    on_result: Optional[Callable[[EpisodeResult], None]] = None,
+) -> BatchReport:
+    """
+    Runs the episodes of {jobs}, see arun_batch. Problems missing
+    from {setups} get their setup generated by their first episode.
+    {on_result} is called with every finished episode.
+    """
+    stats = BatchStats(total=len(jobs))
+    semaphore = asyncio.Semaphore(concurrency)
+    pending: Dict[int, "asyncio.Future[ScenarioSetup]"] = {}
+
+    def setup_for(problem_index: int, problem: Optional[Problem]) -> "asyncio.Future[ScenarioSetup]":
+        # the first episode of a problem generates its setup, the others wait for it
+        if problem_index not in pending:
+            if setups is not None and problem_index in setups:
+                pending[problem_index] = asyncio.get_running_loop().create_future()
+                pending[problem_index].set_result(setups[problem_index])
+            else:
+                pending[problem_index] = asyncio.ensure_future(
+                    agenerate_setup(
+                        scenario_for(scenario_name, problem, settings),
+                        instrumentation=instrumentation,
+                        cache=cache,
+                        setup_cache=setup_cache,
+                    )
+                )
+        return pending[problem_index]
+
+    async def run(index: int, problem_index: int, problem: Optional[Problem]) -> EpisodeResult:
+        async with semaphore:
+            result = await arun_episode(
+                EpisodeResult(index, problem),
+                scenario_name,
+                lambda: setup_for(problem_index, problem),
+                max_iters,
+                settings,
+                instrumentation,
+                cache,
+                dataset,
+            )
+
+        stats.add(result)
+        if on_result is not None:
+            on_result(result)
+        if progress is not None:
+            progress(stats)
+        return result
+
+    results = await asyncio.gather(*[run(index, problem_index, problem) for index, problem_index, problem in jobs])
+    return BatchReport(stats, list(results))
@@ -0,0 +1,159 @@
+"""
+Record/replay cassettes of every model call and speech synthesis.
+
+Recording captures each request with its response and latency into a
+JSONL file; replaying serves the same responses offline, in the order
+they were recorded, so a temperature-1.0 debate reruns exactly. A
+cassette stands in for the ResponseCache of the call path, speech goes
+through Cassette.wrap.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+
+from autodebate.instrumentation import token_usage
+from autodebate.llm_cache import model_params, response_key
+from autodebate.voice import synthesize_elevenlabs
+
+
+def caller() -> Tuple[str, int]:
+    # the task making a call, or its thread outside an event loop
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return ("task", id(task)) if task is not None else ("thread", threading.get_ident())
+
+
+class Cassette:
+    def __init__(self, path: str = "cassette.jsonl", mode: str = "replay", latency: bool = False) -> None:
+        """
+        {mode} is "record", which starts a new cassette at {path}, or
+        "replay". Replayed answers wait their recorded latency if {latency}.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode {mode!r}, expected 'record' or 'replay'")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        # start times of the calls being recorded, per key and caller: a call
+        # that failed is overwritten by the caller's next one, never reused
+        self._started: Dict[Tuple[str, Tuple[str, int]], float] = {}
+        self._entries: Dict[str, Deque[dict]] = defaultdict(deque)
+        self._file = None
+        if mode == "record":
+            self._file = open(path, "w", encoding="utf-8")
+        else:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, entry: dict) -> None:
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def _next(self, key: str, request: str) -> dict:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise LookupError(f"{self.path} has no recorded response left for {request}")
+            return entries.popleft()
+
+    def get(self, model, messages: list, **params) -> Optional[AIMessage]:
+        """
+        Replays the next recorded response to {messages}. While recording
+        it is always a miss and starts timing the call.
+        """
+        key = response_key(model, messages, **params)
+        if self.mode == "record":
+            with self._lock:
+                self._started[key, caller()] = time.perf_counter()
+            return None
+
+        entry = self._next(key, f"a call to {model_params(model)['model']}")
+        prompt_tokens, completion_tokens = entry["usage"]
+        return AIMessage(
+            content=entry["content"],
+            response_metadata={
+                "replayed": True,
+                # the call path waits this long before answering
+                "replay_latency": entry["latency"] if self.latency else 0.0,
+                "token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+            },
+        )
+
+    def put(self, model, messages: list, message, **params) -> None:
+        if self.mode != "record":
+            return
+        key = response_key(model, messages, **params)
+        with self._lock:
+            started = self._started.pop((key, caller()), time.perf_counter())
+        self._write(
+            {
+                "key": key,
+                "kind": "chat",
+                **model_params(model),
+                "messages": [[message.type, message.content] for message in messages],
+                "content": message.content,
+                "usage": list(token_usage(message)),
+                "latency": time.perf_counter() - started,
+            }
+        )
+
+    def synthesize(self, voice_id: str, text: str, synthesize: Callable[..., bytes] = synthesize_elevenlabs) -> bytes:
+        key = hashlib.sha256(json.dumps(["audio", voice_id, text]).encode()).hexdigest()
+        if self.mode == "replay":
+            entry = self._next(key, f"speech of voice {voice_id}")
+            if self.latency:
+                time.sleep(entry["latency"])
+            return base64.b64decode(entry["audio"])
+
+        started = time.perf_counter()
+        audio = synthesize(voice_id, text)
+        self._write(
+            {
+                "key": key,
+                "kind": "audio",
+                "voice_id": voice_id,
+                "text": text,
+                "audio": base64.b64encode(audio).decode("ascii"),
+                "latency": time.perf_counter() - started,
+            }
+        )
+        return audio
+
+    def wrap(self, synthesize: Callable[..., bytes] = synthesize_elevenlabs) -> Callable[[str, str], bytes]:
+        """
+        Turns {synthesize} into one that is recorded or replayed,
+        e.g. for VoicePipeline or read_voice
+        """
+        return lambda voice_id, text: self.synthesize(voice_id, text, synthesize)
+
+    def remaining(self) -> List[str]:
+        """
+        Keys of recorded responses a replay has not served
+        """
+        with self._lock:
+            return [key for key, entries in self._entries.items() for _ in entries]
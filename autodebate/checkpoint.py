@@ -0,0 +1,66 @@
+"""
+Checkpoints of a running debate: the scenario settings, its setup and
+the simulator state, written atomically as gzip-compressed JSON.
+Resuming rebuilds the simulator from them and continues after the last
+completed step, without paying for the setup or the turns again.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from typing import Optional, Tuple
+
+from autodebate.instrumentation import Instrumentation
+from autodebate.llm_cache import ResponseCache
+from autodebate.scenario import Scenario, ScenarioSetup, build_simulator
+from autodebate.scenarios import load_scenario
+from autodebate.simulator import DialogueSimulator
+
+VERSION = 1
+
+
+def save_checkpoint(path: str, scenario: Scenario, setup: ScenarioSetup, simulator: DialogueSimulator) -> None:
+    checkpoint = {
+        "version": VERSION,
+        "scenario": scenario.name,
+        # settings overridden on the instance, e.g. panel
+        "settings": vars(scenario),
+        "setup": asdict(setup),
+        "simulator": simulator.state(),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb") as compressed:
+            compressed.write(json.dumps(checkpoint, separators=(",", ":")).encode("utf-8"))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with gzip.open(path, "rb") as f:
+            checkpoint = json.loads(f.read())
+    except FileNotFoundError:
+        return None
+    if checkpoint.get("version") != VERSION:
+        raise ValueError(f"{path} is a version {checkpoint.get('version')} checkpoint, expected {VERSION}")
+    return checkpoint
+
+
+def resume(
+    checkpoint: dict,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+) -> Tuple[Scenario, ScenarioSetup, DialogueSimulator]:
+    """
+    Rebuilds the scenario and simulator of {checkpoint},
+    ready to run the step after the last one saved
+    """
+    scenario = load_scenario(checkpoint["scenario"], **checkpoint["settings"])
+    setup = ScenarioSetup(**checkpoint["setup"])
+    simulator = build_simulator(scenario, setup, instrumentation, cache)
+    simulator.restore(checkpoint["simulator"])
+    return scenario, setup, simulator
@@ -0,0 +1,353 @@
+"""
+Command line entry point: runs a named scenario and prints the debate
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from typing import List, Optional
+
+from autodebate.checkpoint import load_checkpoint, resume, save_checkpoint
+from autodebate.console import echo, load_env, write
+from autodebate.instrumentation import Instrumentation
+from autodebate.llm import fake_backend
+from autodebate.llm_cache import ResponseCache
+from autodebate.scenario import agenerate_setup, build_simulator
+from autodebate.scenarios import SCENARIOS, load_scenario
+from autodebate.setup_cache import SetupCache
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="autodebate", description="Run a debate scenario.")
+    parser.add_argument("scenario", choices=list(SCENARIOS))
+    parser.add_argument("--max-iters", type=int, help="last step to run, defaults to the scenario's")
+    parser.add_argument("--stream", action="store_true", help="print messages token by token as they are generated")
+    parser.add_argument(
+        "--panel", action="store_true", help="let the juries or teachers answer together, where the scenario supports it"
+    )
+    parser.add_argument(
+        "--routing",
+        action="store_true",
+        help="run agents on a fast model, escalating a turn to their own model on a wrong answer, "
+        "role violation or repetition",
+    )
+    parser.add_argument("--keep-last", type=int, help="turns each agent sees verbatim, older ones are summarized")
+    parser.add_argument("--summarize-every", type=int, help="turns piling up behind --keep-last before the summary is updated")
+    parser.add_argument(
+        "--token-budget", type=int, help="updates the summary early once the verbatim turns exceed about this many tokens"
+    )
+    parser.add_argument("--voice", action="store_true", help="read every message aloud with elevenlabs")
+    parser.add_argument(
+        "--audio-cache",
+        default=os.environ.get("AUTODEBATE_AUDIO_CACHE", ".audio_cache"),
+        help="directory caching synthesized speech, '' to disable (AUTODEBATE_AUDIO_CACHE)",
+    )
+    parser.add_argument(
+        "--cache",
+        default=os.environ.get("AUTODEBATE_CACHE"),
+        help="SQLite file caching model responses (AUTODEBATE_CACHE)",
+    )
+    parser.add_argument(
+        "--regenerate",
+        action="store_true",
+        default=bool(os.environ.get("AUTODEBATE_REGENERATE")),
+        help="regenerate personas and opening topic instead of reusing them (AUTODEBATE_REGENERATE)",
+    )
+    parser.add_argument(
+        "--dataset",
+        default=os.environ.get("AUTODEBATE_DATASET"),
+        help="directory the finished episode is appended to as a dataset record (AUTODEBATE_DATASET)",
+    )
+    parser.add_argument("--chat-speaker", help="also store the episode as chat fine-tuning messages of this speaker")
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="save the debate to PATH as it runs and resume from it if it exists, removed once the run completes",
+    )
+    parser.add_argument("--checkpoint-every", type=int, default=1, help="steps between checkpoints")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="CASSETTE", help="record every model call and speech synthesis to CASSETTE")
+    cassette.add_argument("--replay", metavar="CASSETTE", help="serve model calls and speech offline from CASSETTE")
+    parser.add_argument("--replay-latency", action="store_true", help="wait the recorded latency of every replayed call")
+    parser.add_argument(
+        "--rate-limit",
+        action="store_true",
+        help="limit requests and tokens per minute per model, retrying throttled calls with backoff",
+    )
+    parser.add_argument("--max-connections", type=int, help="size of the HTTP connection pool shared by all model clients")
+    parser.add_argument("--episodes", type=int, default=1, help="episodes to run, per problem with --problems")
+    parser.add_argument(
+        "--problems", metavar="FILE", help="one quest, or JSON object of scenario settings, per line; one batch over all"
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="episodes in flight at once in a batch")
+    parser.add_argument(
+        "--processes", type=int, default=1, help="worker processes of a batch, each with its own dataset shards"
+    )
+    parser.add_argument("--jobs", metavar="STORE", help="SQLite job store to work on, shared by any number of nodes")
+    parser.add_argument(
+        "--enqueue", action="store_true", help="queue the batch in the --jobs store instead of running it"
+    )
+    parser.add_argument(
+        "--seed", type=int, help="seed of the first queued episode, defaults to one past the highest seed in the store"
+    )
+    parser.add_argument("--worker", help="name of this worker in the --jobs store, defaults to host and pid")
+    parser.add_argument("--setup-concurrency", type=int, default=5, help="setup calls in flight at once")
+    parser.add_argument("--metrics", default="metrics", help="writes METRICS.json and METRICS.prom, '' to skip")
+    args = parser.parse_args(argv)
+    if args.cache and (args.record or args.replay):
+        parser.error("--cache cannot be combined with --record or --replay")
+    if args.processes > 1 and (args.record or args.replay):
+        parser.error("--record and --replay run in a single process")
+    if args.enqueue and not args.jobs:
+        parser.error("--enqueue needs --jobs")
+    if args.seed is not None and not args.enqueue:
+        parser.error("--seed only applies with --enqueue")
+    return args
+
+
+def scenario_settings(args: argparse.Namespace) -> dict:
+    settings: dict = {key: True for key in ("panel", "routing") if getattr(args, key)}
+    context_policy = {
+        key: getattr(args, key) for key in ("keep_last", "summarize_every", "token_budget") if getattr(args, key) is not None
+    }
+    if context_policy:
+        settings["context_policy"] = context_policy
+    return settings
+
+
+def run_batch(
+    args: argparse.Namespace,
+    instrumentation: Instrumentation,
+    cache: Optional[ResponseCache],
+    setup_cache: Optional[SetupCache],
+) -> None:
+    """
+    Runs the episodes of a batch without printing them, reporting progress instead
+    """
+    from autodebate.batch import arun_batch, load_problems
+    from autodebate.dataset import DatasetWriter
+
+    problems = load_problems(args.problems) if args.problems else None
+    settings = scenario_settings(args) or None
+    progress = lambda stats: write(f"\r{stats}")  # noqa: E731
+    if args.processes > 1:
+        from autodebate.workers import run_pool
+
+        report = run_pool(
+            args.scenario,
+            episodes=args.episodes,
+            problems=problems,
+            processes=args.processes,
+            concurrency=args.concurrency,
+            max_iters=args.max_iters,
+            settings=settings,
+            instrumentation=instrumentation,
+            cache=args.cache,
+            setup_cache=setup_cache,
+            dataset=args.dataset,
+            chat_speaker=args.chat_speaker,
+            rate_limit=args.rate_limit,
+            progress=progress,
+        )
+        report_batch(args, instrumentation, report)
+        return
+
+    dataset = DatasetWriter(args.dataset, chat_speaker=args.chat_speaker) if args.dataset else None
+    try:
+        report = asyncio.run(
+            arun_batch(
+                args.scenario,
+                episodes=args.episodes,
+                problems=problems,
+                concurrency=args.concurrency,
+                max_iters=args.max_iters,
+                settings=settings,
+                instrumentation=instrumentation,
+                cache=cache,
+                setup_cache=setup_cache,
+                dataset=dataset,
+                progress=progress,
+            )
+        )
+    finally:
+        if dataset is not None:
+            dataset.close()
+    report_batch(args, instrumentation, report)
+
+
+def run_jobs(
+    args: argparse.Namespace,
+    instrumentation: Instrumentation,
+    cache: Optional[ResponseCache],
+    setup_cache: Optional[SetupCache],
+) -> None:
+    """
+    Queues the batch in the job store with --enqueue,
+    otherwise works on its jobs until none are left
+    """
+    from autodebate.batch import load_problems
+    from autodebate.dataset import DatasetWriter
+    from autodebate.jobs import SQLiteJobStore, awork, default_worker
+
+    store = SQLiteJobStore(args.jobs)
+    if args.enqueue:
+        ids = store.enqueue(
+            args.scenario,
+            episodes=args.episodes,
+            problems=load_problems(args.problems) if args.problems else None,
+            settings=scenario_settings(args) or None,
+            max_iters=args.max_iters,
+            seed=args.seed,
+        )
+        echo(f"Queued {len(ids)} episodes in {args.jobs}.")
+        return
+
+    worker = args.worker or default_worker()
+    # shards named after the worker, nodes may share the dataset directory
+    dataset = DatasetWriter(args.dataset, prefix=worker, chat_speaker=args.chat_speaker) if args.dataset else None
+    try:
+        report = asyncio.run(
+            awork(
+                store,
+                worker,
+                scenario_name=args.scenario,
+                concurrency=args.concurrency,
+                instrumentation=instrumentation,
+                cache=cache,
+                setup_cache=setup_cache,
+                dataset=dataset,
+                progress=lambda stats: write(f"\r{stats}"),
+            )
+        )
+    finally:
+        if dataset is not None:
+            dataset.close()
+    report_batch(args, instrumentation, report)
+
+
+def report_batch(args: argparse.Namespace, instrumentation: Instrumentation, report) -> None:
+    write("\n")
+    for failure in report.failures[:3]:
+        echo(f"Episode {failure.index} failed:\n{failure.error}")
+    if args.metrics:
+        instrumentation.save(args.metrics)
+        with open(f"{args.metrics}.batch.json", "w") as f:
+            json.dump(report.stats.to_dict(), f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    load_env()
+
+    if args.rate_limit:
+        from autodebate.rate_limit import configure_rate_limits
+
+        configure_rate_limits()
+    if args.max_connections is not None:
+        from autodebate.clients import configure_clients
+
+        configure_clients(max_connections=args.max_connections)
+    scenario = load_scenario(args.scenario, **scenario_settings(args))
+    # batches only keep the totals, a record per call would grow with every episode
+    instrumentation = Instrumentation(keep_calls=not (args.jobs or args.episodes > 1 or args.problems))
+    cache = ResponseCache(args.cache) if args.cache else None
+    cassette = None
+    if args.record or args.replay:
+        from autodebate.cassette import Cassette
+
+        cassette = Cassette(args.record or args.replay, "record" if args.record else "replay", args.replay_latency)
+        if args.replay:
+            # replays run offline, ChatOpenAI only needs a key to be built
+            if not os.environ.get("OPENAI_API_KEY"):
+                os.environ["OPENAI_API_KEY"] = "replay"
+        # the cassette answers in place of the response cache
+        cache = cassette
+
+    # fake personas must not be reused by real runs, cassettes hold their own
+    setup_cache = None if fake_backend() or cassette is not None else SetupCache()
+    if args.jobs:
+        run_jobs(args, instrumentation, cache, setup_cache)
+        if cassette is not None:
+            cassette.close()
+        return
+    if args.episodes > 1 or args.problems:
+        run_batch(args, instrumentation, cache, setup_cache)
+        if cassette is not None:
+            cassette.close()
+        return
+
+    checkpoint = load_checkpoint(args.checkpoint) if args.checkpoint else None
+    if checkpoint is not None:
+        if checkpoint["scenario"] != scenario.name:
+            raise SystemExit(f"{args.checkpoint} holds a {checkpoint['scenario']} debate, not {scenario.name}")
+        scenario, setup, simulator = resume(checkpoint, instrumentation, cache)
+        echo(f"Resuming from {args.checkpoint} at step {simulator._step - 1}.\n")
+    else:
+        setup = asyncio.run(
+            agenerate_setup(scenario, args.setup_concurrency, instrumentation, cache, setup_cache, args.regenerate)
+        )
+        scenario.describe(setup)
+        simulator = build_simulator(scenario, setup, instrumentation, cache)
+
+    max_iters = scenario.max_iters if args.max_iters is None else args.max_iters
+    voice = None
+    if args.voice:
+        from autodebate.audio_cache import AudioCache
+        from autodebate.voice import VoicePipeline
+
+        synthesize = AudioCache(args.audio_cache).wrap() if args.audio_cache else None
+        if cassette is not None:
+            synthesize = cassette.wrap(synthesize) if synthesize is not None else cassette.wrap()
+        # speech plays in the background while the next turn is generated
+        voice = VoicePipeline(scenario.voice_map, synthesize=synthesize)
+
+    # step 0 is the opening message
+    n = simulator._step - 1
+    while n <= max_iters and not simulator.done:
+
+        if args.stream:
+            speaking = None
+            for name, token in simulator.step_stream():
+                if name != speaking:
+                    # a fan-out step yields several speakers in a row
+                    if speaking is not None:
+                        write("\n")
+                        if voice is not None:
+                            voice.flush(speaking)
+                    write(f"{n} ({name}): ")
+                    speaking = name
+                write(token)
+                if voice is not None:
+                    voice.feed(name, token)
+            write("\n")
+            if voice is not None:
+                voice.flush(speaking)
+        else:
+            turn = simulator.step()
+
+            for name, message in turn if isinstance(turn, list) else [turn]:
+                echo(f"{n} ({name}): {message}")
+                if voice is not None:
+                    voice.say(name, message)
+        echo("\n")
+
+        n += 1
+        if args.checkpoint and n % args.checkpoint_every == 0:
+            save_checkpoint(args.checkpoint, scenario, setup, simulator)
+
+    if simulator.done:
+        echo("Answer verified, the episode ended early.")
+    if voice is not None:
+        voice.close()
+    if cassette is not None:
+        cassette.close()
+    if args.dataset:
+        from autodebate.dataset import DatasetWriter
+
+        with DatasetWriter(args.dataset, chat_speaker=args.chat_speaker) as dataset:
+            dataset.write_episode(simulator, scenario=scenario.name)
+    if args.metrics:
+        instrumentation.save(args.metrics)
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
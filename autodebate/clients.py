@@ -0,0 +1,130 @@
+"""
+Process-wide registry of chat model clients, used by chat_model.
+
+Agents and setup calls with the same (model, temperature, options) get
+the same ChatOpenAI, and every client shares one pooled HTTP transport,
+so keep-alive connections are reused instead of each instance opening
+its own. A forked child starts with fresh clients.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict, Optional
+
+import httpx
+
+from autodebate import rate_limit
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport keeping one connection pool per event loop, pooled
+    connections belong to the loop that opened them
+    """
+
+    def __init__(self, limits: httpx.Limits) -> None:
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = httpx.AsyncHTTPTransport(limits=self.limits)
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class ClientRegistry:
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 120.0,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=10.0)
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._models: Dict[str, "BaseChatModel"] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+
+    def _check_fork(self) -> None:
+        # connections must not cross a fork, start over in the child
+        if self._pid != os.getpid():
+            self._models = {}
+            self._http_client = httpx.Client(limits=self.limits, timeout=self.timeout)
+            self._http_async_client = httpx.AsyncClient(transport=LoopLocalTransport(self.limits), timeout=self.timeout)
+            self._pid = os.getpid()
+
+    @staticmethod
+    def _defaults(model_class) -> dict:
+        # custom http clients turn off langchain's default stream_usage,
+        # streamed calls need their usage; older versions have no such field
+        fields = getattr(model_class, "model_fields", None) or getattr(model_class, "__fields__", {})
+        return {"stream_usage": True} if "stream_usage" in fields else {}
+
+    def chat_model(self, **kwargs) -> "BaseChatModel":
+        """
+        Returns the ChatOpenAI built from {kwargs}, creating it on first use
+        """
+        from langchain_openai import ChatOpenAI
+
+        if rate_limit.limiter is not None:
+            # throttling must reach the rate limiter, not be retried inside the client
+            kwargs = {"max_retries": 0, **kwargs}
+        key = json.dumps(kwargs, sort_keys=True, default=repr)
+        with self._lock:
+            self._check_fork()
+            model = self._models.get(key)
+            if model is None:
+                model = self._models[key] = ChatOpenAI(
+                    **{
+                        "http_client": self._http_client,
+                        "http_async_client": self._http_async_client,
+                        **self._defaults(ChatOpenAI),
+                        **kwargs,
+                    }
+                )
+        return model
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid() and self._http_client is not None:
+                self._http_client.close()
+            self._pid = None
+            self._models = {}
+
+
+registry = ClientRegistry()
+
+
+def configure_clients(**limits) -> None:
+    """
+    Replaces the registry with one using the given pool limits,
+    see ClientRegistry for their names
+    """
+    global registry
+    registry.close()
+    registry = ClientRegistry(**limits)
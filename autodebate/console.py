@@ -0,0 +1,38 @@
+"""
+Console output, rendered with rich when it is installed
+"""
+
+import sys
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _printer():
+    try:
+        from rich import print
+    except ImportError:
+        from builtins import print
+    return print
+
+
+def echo(*args, **kwargs) -> None:
+    _printer()(*args, **kwargs)
+
+
+def write(text: str) -> None:
+    """
+    Writes {text} as is and flushes, for streamed tokens
+    """
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def load_env() -> None:
+    """
+    Loads a .env file when python-dotenv is installed
+    """
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
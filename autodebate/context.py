@@ -0,0 +1,56 @@
+from typing import TYPE_CHECKING, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+    from autodebate.agents import DialogueAgent
+
+
+class ContextPolicy:
+    """
+    Keeps the last {keep_last} turns verbatim and folds older turns
+    into a rolling summary. The summary is only refreshed once
+    {summarize_every} turns have piled up behind the window, or once the
+    verbatim part grows past roughly {token_budget} tokens.
+    """
+
+    def __init__(
+        self,
+        keep_last: int = 8,
+        summarize_every: int = 4,
+        token_budget: Optional[int] = None,
+        summary_words: int = 150,
+        model: Optional["BaseChatModel"] = None,
+    ) -> None:
+        self.keep_last = keep_last
+        self.summarize_every = summarize_every
+        self.token_budget = token_budget
+        self.summary_words = summary_words
+        # defaults to the agent's own model, build_simulator passes one
+        # without the output guard's settings so summaries are not cut short
+        self.model = model
+
+    def due(self, agent: "DialogueAgent") -> bool:
+        pending = len(agent.transcript) - agent.summarized
+        if pending <= self.keep_last:
+            return False
+        if pending >= self.keep_last + self.summarize_every:
+            return True
+        # roughly 4 characters per token
+        verbatim = agent.transcript.render(agent.summarized)
+        return self.token_budget is not None and len(verbatim) / 4 > self.token_budget
+
+    def summary_prompt(self, agent: "DialogueAgent", end: int) -> list:
+        return [
+            SystemMessage(content="You summarize conversations."),
+            HumanMessage(
+                content=f"""Summary of the conversation so far: {agent.summary or "(empty)"}
+        New lines:
+        {agent.transcript.render(agent.summarized, end)}
+        Update the summary with the new lines, in {self.summary_words} words or less.
+        Keep who said what, what was decided and what is still open.
+        Do not add anything else."""
+            ),
+        ]
@@ -0,0 +1,280 @@
+"""
+Streaming export of finished episodes as a synthetic dataset.
+
+Every episode is one JSON record appended to the open shard, compressed
+as a gzip member of its own, so a shard is a valid .jsonl.gz file after
+each write and a crash loses at most the episode being written. Shards
+rotate once they reach {max_shard_bytes}; the open one carries a
+.partial suffix until it is closed and stays locked by its writer, so
+writers sharing a directory and prefix never take the same shard, nor
+close each other's. Closed shards can be converted to
+Parquet with to_parquet, which needs pyarrow.
+"""
+
+import glob
+import gzip
+import json
+import os
+import tempfile
+import threading
+import zlib
+from typing import Iterator, List, Optional
+
+from autodebate.instrumentation import model_name
+from autodebate.simulator import DialogueSimulator, Turn
+
+try:
+    import fcntl
+except ImportError:  # Windows, where writers cannot share a directory and prefix
+    fcntl = None
+
+PARTIAL = ".partial"
+
+
+def try_lock(f) -> bool:
+    """
+    Locks the open file {f} for as long as it stays open, returns False
+    when another process holds the lock
+    """
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def valid_length(path: str, compress: bool) -> int:
+    """
+    Returns how many leading bytes of the shard at {path} hold complete
+    records, anything after them was cut short by a crash
+    """
+    with open(path, "rb") as f:
+        if not compress:
+            return f.read().rfind(b"\n") + 1
+
+        end = offset = 0
+        member = zlib.decompressobj(31)
+        pending = b""
+        while True:
+            chunk = pending or f.read(1 << 16)
+            if not chunk:
+                return end
+            pending = b""
+            try:
+                member.decompress(chunk)
+            except zlib.error:
+                return end
+            offset += len(chunk)
+            if member.eof:
+                # the next member starts in the unused tail of this chunk
+                pending = member.unused_data
+                offset -= len(pending)
+                end = offset
+                member = zlib.decompressobj(31)
+
+
+def read_records(path: str) -> Iterator[dict]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+class DatasetWriter:
+    def __init__(
+        self,
+        directory: str = "dataset",
+        max_shard_bytes: int = 64 * 1024 * 1024,
+        compress: bool = True,
+        prefix: str = "shard",
+        chat_speaker: Optional[str] = None,
+        fsync: bool = True,
+    ) -> None:
+        """
+        Writes shards named {prefix}-00000.jsonl.gz and so on into {directory}.
+        With {chat_speaker} set, records also carry the episode in the chat
+        fine-tuning layout, that speaker's messages being the assistant's.
+        """
+        self.directory = directory
+        self.max_shard_bytes = max_shard_bytes
+        self.compress = compress
+        self.prefix = prefix
+        self.chat_speaker = chat_speaker
+        self.fsync = fsync
+        self.suffix = ".jsonl.gz" if compress else ".jsonl"
+        self.episodes = 0
+        # shards closed by this writer, e.g. for a manifest
+        self.closed: List[dict] = []
+        self._shard_episodes = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = ""
+        os.makedirs(self.directory, exist_ok=True)
+        self.recover()
+        # continue after the last closed shard
+        self._index = max((self.shard_index(path) for path in self.shards()), default=-1) + 1
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def shards(self) -> List[str]:
+        """
+        Paths of the closed shards, in order
+        """
+        return sorted(glob.glob(os.path.join(glob.escape(self.directory), f"{self.prefix}-*{self.suffix}")))
+
+    def shard_index(self, path: str) -> int:
+        return int(os.path.basename(path)[len(self.prefix) + 1 :].split(".")[0])
+
+    def recover(self) -> None:
+        """
+        Closes shards left open by an interrupted run, dropping the
+        incomplete record at their end. Shards a live writer still holds
+        are left alone.
+        """
+        for path in sorted(glob.glob(os.path.join(glob.escape(self.directory), f"{self.prefix}-*{self.suffix}{PARTIAL}"))):
+            try:
+                f = open(path, "r+b")
+            except FileNotFoundError:
+                # closed or recovered by another writer meanwhile
+                continue
+            with f:
+                if not try_lock(f) or not os.path.exists(path):
+                    continue
+                length = valid_length(path, self.compress)
+                if length == 0:
+                    os.remove(path)
+                    continue
+                f.truncate(length)
+                os.replace(path, path[: -len(PARTIAL)])
+
+    def record(self, simulator: DialogueSimulator, **metadata) -> dict:
+        """
+        Builds the record of the episode {simulator} ran, {metadata} such
+        as the scenario name is stored alongside
+        """
+        agents = {agent.name: agent for agent in simulator.agents}
+
+        def model_settings(turn: Turn) -> dict:
+            if turn.model is not None:
+                return {"model": turn.model, "temperature": turn.temperature}
+            # turns saved before the simulator kept their model
+            agent = agents.get(turn.name)
+            if agent is None:
+                return {"model": None, "temperature": None}
+            return {"model": model_name(agent.model), "temperature": getattr(agent.model, "temperature", None)}
+
+        record = {
+            **metadata,
+            "verified": simulator.verified_step is not None if simulator.verifier is not None else None,
+            "verified_step": simulator.verified_step,
+            "turns": [
+                {
+                    "step": turn.step,
+                    "speaker": turn.name,
+                    "message": turn.message,
+                    **model_settings(turn),
+                    "verified": turn.verified,
+                }
+                for turn in simulator.turns
+            ],
+        }
+        if self.chat_speaker in agents:
+            record["messages"] = [{"role": "system", "content": agents[self.chat_speaker].system_message.content}] + [
+                {"role": "assistant", "content": turn.message}
+                if turn.name == self.chat_speaker
+                else {"role": "user", "content": f"{turn.name}: {turn.message}"}
+                for turn in simulator.turns
+            ]
+        return record
+
+    def write_episode(self, simulator: DialogueSimulator, **metadata) -> None:
+        self.write(self.record(simulator, **metadata))
+
+    def write(self, record: dict) -> None:
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        if self.compress:
+            member = zlib.compressobj(6, zlib.DEFLATED, 31)
+            data = member.compress(data) + member.flush()
+
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.episodes += 1
+            self._shard_episodes += 1
+            if self._file.tell() >= self.max_shard_bytes:
+                self._rotate()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._rotate()
+
+    def _open(self) -> None:
+        # the shard is locked before it is linked in under its partial name,
+        # so recover never sees it unlocked, and linking fails if the index is taken
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{self.prefix}-", suffix=".tmp")
+        f = os.fdopen(fd, "ab")
+        try_lock(f)
+        try:
+            while True:
+                path = os.path.join(self.directory, f"{self.prefix}-{self._index:05d}{self.suffix}")
+                if not os.path.exists(path):
+                    try:
+                        os.link(tmp, path + PARTIAL)
+                    except FileExistsError:
+                        pass
+                    else:
+                        # another writer may have closed this index just before
+                        if not os.path.exists(path):
+                            break
+                        os.remove(path + PARTIAL)
+                self._index += 1
+        except BaseException:
+            f.close()
+            raise
+        finally:
+            os.remove(tmp)
+        self._file = f
+        self._path = path
+
+    def _rotate(self) -> None:
+        size = self._file.tell()
+        # renamed while still locked, recover must not close it first
+        os.replace(self._path + PARTIAL, self._path)
+        self._file.close()
+        self._file = None
+        self.closed.append({"path": os.path.basename(self._path), "episodes": self._shard_episodes, "bytes": size})
+        self._shard_episodes = 0
+        self._index += 1
+
+
+def to_parquet(directory: str = "dataset", prefix: str = "shard") -> int:
+    """
+    Converts every closed shard of {directory} that has no Parquet
+    counterpart yet, returns the number of files written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    written = 0
+    for path in sorted(glob.glob(os.path.join(glob.escape(directory), f"{prefix}-*.jsonl*"))):
+        if path.endswith(PARTIAL):
+            continue
+        target = path[: path.index(".jsonl")] + ".parquet"
+        if os.path.exists(target):
+            continue
+        table = pa.Table.from_pylist(list(read_records(path)))
+        pq.write_table(table, target + PARTIAL)
+        os.replace(target + PARTIAL, target)
+        written += 1
+    return written
@@ -0,0 +1,103 @@
+"""
+A local stand-in for ChatOpenAI: deterministic replies after a fixed
+latency, with token usage reported like OpenAI does. Used to run and
+benchmark debates without API calls, see chat_model.
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+WORDS = (
+    "the student should isolate one variable first then substitute it into the other equation "
+    "and check both sides carefully before giving a final answer to the supervisor"
+).split()
+
+
+class FakeChatModel(BaseChatModel):
+    model_name: str = "fake"
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+    # seconds before the reply, spread over the chunks when streaming
+    latency: float = 0.0
+    # words per reply
+    words: int = 50
+    seed: int = 0
+
+    def __init__(self, model: str = "fake", **kwargs: Any) -> None:
+        # accepts the ChatOpenAI settings the scenarios pass, e.g. model=...
+        # model_fields on pydantic 2 models, __fields__ on the pydantic.v1 ones of older langchain
+        known = getattr(type(self), "model_fields", None) or type(self).__fields__
+        fields = {key: value for key, value in kwargs.items() if key in known}
+        # "fake-gpt-4" is neither priced nor cached as gpt-4
+        super().__init__(model_name=model if model.startswith("fake") else f"fake-{model}", **fields)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def reply(self, messages: List[BaseMessage], seed: Optional[int] = None) -> List[str]:
+        """
+        The words of the reply, a function of the seed and the prompt only,
+        {seed} is a call's own seed and overrides the model's
+        """
+        prompt = "\n".join(f"{message.type}: {message.content}" for message in messages)
+        digest = hashlib.sha256(f"{self.seed if seed is None else seed}\n{self.model_name}\n{prompt}".encode()).digest()
+        rng = random.Random(digest)
+        words = self.words if self.max_tokens is None else min(self.words, self.max_tokens)
+        return [rng.choice(WORDS) for _ in range(words)]
+
+    def usage(self, messages: List[BaseMessage], words: List[str]) -> dict:
+        # about 4 characters per token, as in ContextPolicy
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        return {
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(words),
+                "total_tokens": prompt_tokens + len(words),
+            },
+            "model_name": self.model_name,
+            # whether max_tokens cut the reply, as OpenAI reports it
+            "finish_reason": "length" if self.max_tokens is not None and self.max_tokens < self.words else "stop",
+        }
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        words = self.reply(messages, kwargs.get("seed"))
+        if self.latency:
+            time.sleep(self.latency)
+        message = AIMessage(content=" ".join(words), response_metadata=self.usage(messages, words))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        words = self.reply(messages, kwargs.get("seed"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = AIMessage(content=" ".join(words), response_metadata=self.usage(messages, words))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, words: List[str]) -> List[str]:
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        words = self.reply(messages, kwargs.get("seed"))
+        for chunk in self._chunks(words):
+            if self.latency:
+                time.sleep(self.latency / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata=self.usage(messages, words)))
+
+    async def _astream(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        words = self.reply(messages, kwargs.get("seed"))
+        for chunk in self._chunks(words):
+            if self.latency:
+                await asyncio.sleep(self.latency / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata=self.usage(messages, words)))
@@ -0,0 +1,84 @@
+import re
+from typing import List, Optional, Tuple
+
+# OpenAI accepts at most 4 stop sequences, the trimming catches the rest
+MAX_STOP_SEQUENCES = 4
+
+
+class OutputGuard:
+    """
+    Keeps an agent's replies to its own turn: caps them at {max_tokens}
+    and stops them where a line of one of {others} would start. Text the
+    model still writes as one of {others} is trimmed by cut.
+    """
+
+    def __init__(self, others: List[str], max_tokens: Optional[int] = None) -> None:
+        self.others = others
+        self.max_tokens = max_tokens
+        names = "|".join(re.escape(name) for name in sorted(others, key=len, reverse=True))
+        # "Student: ..." at the start of a line, as the stop sequences see it; a
+        # name after a sentence end is the speaker addressing someone
+        self.pattern = re.compile(rf"^[ \t]*(?:{names}):[ \t]*", re.MULTILINE) if others else None
+        self.prefixes = [f"{name}:" for name in others]
+
+    def model_settings(self) -> dict:
+        """
+        The chat model settings enforcing the guard, see chat_model
+        """
+        settings: dict = {"stop": [f"\n{name}:" for name in self.others[:MAX_STOP_SEQUENCES]]}
+        if self.max_tokens is not None:
+            settings["max_tokens"] = self.max_tokens
+        return settings
+
+    def lead(self, message: str) -> int:
+        """
+        Returns the length of the role tag {message} opens with
+        as someone else, 0 when it does not
+        """
+        match = None if self.pattern is None else self.pattern.match(message)
+        return 0 if match is None else match.end()
+
+    def cut(self, message: str, start: int = 0) -> Optional[int]:
+        """
+        Returns where {message} goes on as someone else after {start}, if it does
+        """
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(message, start)
+        return None if match is None else match.start()
+
+    def held_back(self, message: str) -> int:
+        """
+        Returns how many trailing characters of a partial {message} could
+        still turn into another speaker's prefix, so must not be shown yet
+        """
+        start = message.rfind("\n") + 1
+        tail = message[start:].lstrip(" \t")
+        if tail and any(prefix.startswith(tail) for prefix in self.prefixes):
+            return len(message) - start
+        return 0
+
+    def visible(self, message: str) -> Tuple[int, int, bool]:
+        """
+        Returns where the part of a partial {message} that can be shown
+        while it streams starts and ends, and whether it went on as
+        someone else after its own text
+        """
+        start = self.lead(message)
+        cut = self.cut(message, start)
+        if cut is not None:
+            return start, max(start, len(message[:cut].rstrip())), True
+        end = len(message) - self.held_back(message)
+        return start, max(start, len(message[:end].rstrip())), False
+
+    def trim(self, message: str) -> Optional[str]:
+        """
+        Returns {message} without what it wrote as someone else: the role
+        tag it opens with and everything from the next line another
+        speaker starts. None when there is nothing to trim.
+        """
+        start = self.lead(message)
+        cut = self.cut(message, start)
+        if not start and cut is None:
+            return None
+        return message[start:cut].rstrip()
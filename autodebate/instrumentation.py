@@ -0,0 +1,279 @@
+"""
+Per-call instrumentation for the chat model calls of a debate:
+wall time, time to first token, prompt/completion tokens and estimated
+cost, aggregated per agent and per step. Agents also count events such
+as escalations to a stronger model.
+
+Exports as a JSON summary or in the Prometheus text format.
+"""
+
+import json
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+
+# step of the simulator currently driving a call, None during setup
+current_step: ContextVar[Optional[int]] = ContextVar("current_step", default=None)
+
+# dollars per 1K (prompt, completion) tokens
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+@dataclass
+class CallRecord:
+    agent: str
+    step: Optional[int]
+    model: str
+    wall_time: float
+    time_to_first_token: float
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+
+
+def model_name(model) -> str:
+    return getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+
+
+def token_usage(message) -> Tuple[int, int]:
+    """
+    Reads (prompt, completion) token counts from the response metadata
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+class CallTimer:
+    """
+    Measures a single call, started by Instrumentation.start
+    """
+
+    def __init__(self, instrumentation: "Instrumentation", agent: str, model) -> None:
+        self.instrumentation = instrumentation
+        self.agent = agent
+        self.model = model_name(model)
+        self.step = current_step.get()
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+    def first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def finish(self, message) -> CallRecord:
+        finished = time.perf_counter()
+        prompt_tokens, completion_tokens = token_usage(message)
+        record = CallRecord(
+            agent=self.agent,
+            step=self.step,
+            model=self.model,
+            wall_time=finished - self.started,
+            # without streaming the whole completion arrives at once
+            time_to_first_token=(self.first_token_at or finished) - self.started,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=self.instrumentation.cost(self.model, prompt_tokens, completion_tokens),
+        )
+        self.instrumentation.record(record)
+        return record
+
+
+@dataclass
+class Aggregate:
+    """
+    Running totals of a group of calls
+    """
+
+    calls: int = 0
+    wall_time: float = 0.0
+    max_wall_time: float = 0.0
+    time_to_first_token: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+    def add(self, record: CallRecord) -> None:
+        self.merge(
+            Aggregate(
+                1,
+                record.wall_time,
+                record.wall_time,
+                record.time_to_first_token,
+                record.prompt_tokens,
+                record.completion_tokens,
+                record.cost,
+            )
+        )
+
+    def merge(self, other: "Aggregate") -> None:
+        self.calls += other.calls
+        self.wall_time += other.wall_time
+        self.max_wall_time = max(self.max_wall_time, other.max_wall_time)
+        self.time_to_first_token += other.time_to_first_token
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cost += other.cost
+
+    def to_dict(self) -> dict:
+        if not self.calls:
+            return {"calls": 0}
+        return {
+            "calls": self.calls,
+            "wall_time": self.wall_time,
+            "max_wall_time": self.max_wall_time,
+            "mean_time_to_first_token": self.time_to_first_token / self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+        }
+
+
+class Instrumentation:
+    def __init__(self, prices: Optional[Dict[str, Tuple[float, float]]] = None, keep_calls: bool = True) -> None:
+        """
+        Calls are aggregated as they are recorded, their CallRecords are
+        only kept, and listed in the summary, with {keep_calls}
+        """
+        self.prices = DEFAULT_PRICES if prices is None else prices
+        self.keep_calls = keep_calls
+        self.records: List[CallRecord] = []
+        self.total = Aggregate()
+        self.agents: Dict[str, Aggregate] = {}
+        self.steps: Dict[int, Aggregate] = {}
+        # (agent, model) -> totals, the series of to_prometheus
+        self.series: Dict[Tuple[str, str], Aggregate] = {}
+        # (agent, event) -> times it happened
+        self.events: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def start(self, agent: str, model) -> CallTimer:
+        return CallTimer(self, agent, model)
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            if self.keep_calls:
+                self.records.append(record)
+            self.total.add(record)
+            self.agents.setdefault(record.agent, Aggregate()).add(record)
+            if record.step is not None:
+                self.steps.setdefault(record.step, Aggregate()).add(record)
+            self.series.setdefault((record.agent, record.model), Aggregate()).add(record)
+
+    def count(self, agent: str, event: str, times: int = 1) -> None:
+        with self._lock:
+            self.events[agent, event] = self.events.get((agent, event), 0) + times
+
+    def totals(self) -> dict:
+        """
+        The aggregates and events, without the records, e.g. for
+        a worker process to hand to merge in the parent
+        """
+        with self._lock:
+            return {
+                "agents": {agent: replace(aggregate) for agent, aggregate in self.agents.items()},
+                "steps": {step: replace(aggregate) for step, aggregate in self.steps.items()},
+                "series": {key: replace(aggregate) for key, aggregate in self.series.items()},
+                "events": dict(self.events),
+            }
+
+    def merge(self, totals: dict) -> None:
+        """
+        Adds the {totals} of another instrumentation to this one
+        """
+        with self._lock:
+            for agent, aggregate in totals["agents"].items():
+                self.agents.setdefault(agent, Aggregate()).merge(aggregate)
+            for step, aggregate in totals["steps"].items():
+                self.steps.setdefault(step, Aggregate()).merge(aggregate)
+            for key, aggregate in totals["series"].items():
+                self.series.setdefault(key, Aggregate()).merge(aggregate)
+                # every call is in exactly one series
+                self.total.merge(aggregate)
+            for key, times in totals["events"].items():
+                self.events[key] = self.events.get(key, 0) + times
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        # "gpt-4-0613" is priced as "gpt-4", the longest matching prefix wins
+        matches = [name for name in self.prices if model.startswith(name)]
+        if not matches:
+            return 0.0
+        prompt_price, completion_price = self.prices[max(matches, key=len)]
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+    def summary(self) -> dict:
+        """
+        The calls aggregated per agent and per step,
+        followed by every call when they are kept
+        """
+        with self._lock:
+            agent_events: Dict[str, Dict[str, int]] = {}
+            for (agent, event), times in sorted(self.events.items()):
+                agent_events.setdefault(agent, {})[event] = times
+
+            summary = {
+                "total": self.total.to_dict(),
+                "agents": {agent: aggregate.to_dict() for agent, aggregate in self.agents.items()},
+                "steps": {step: aggregate.to_dict() for step, aggregate in sorted(self.steps.items())},
+                "events": agent_events,
+            }
+            if self.keep_calls:
+                summary["calls"] = [asdict(record) for record in self.records]
+        return summary
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.summary(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "autodebate_llm") -> str:
+        """
+        Renders per agent and model counters in the Prometheus text format
+        """
+        with self._lock:
+            series = {key: replace(aggregate) for key, aggregate in self.series.items()}
+            events = dict(self.events)
+
+        metrics = [
+            ("calls_total", "counter", "Chat model calls", lambda a: a.calls),
+            ("wall_seconds_total", "counter", "Wall time spent in calls", lambda a: a.wall_time),
+            ("wall_seconds_max", "gauge", "Slowest call", lambda a: a.max_wall_time),
+            ("time_to_first_token_seconds_sum", "counter", "Summed time to first token", lambda a: a.time_to_first_token),
+            ("prompt_tokens_total", "counter", "Prompt tokens sent", lambda a: a.prompt_tokens),
+            ("completion_tokens_total", "counter", "Completion tokens received", lambda a: a.completion_tokens),
+            ("cost_dollars_total", "counter", "Estimated cost", lambda a: a.cost),
+        ]
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for (agent, model), aggregate in series.items():
+                labels = f'agent="{escape_label(agent)}",model="{escape_label(model)}"'
+                lines.append(f"{prefix}_{name}{{{labels}}} {value(aggregate)}")
+        if events:
+            lines.append(f"# HELP {prefix}_events_total Events counted by the agents")
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for (agent, event), times in sorted(events.items()):
+                labels = f'agent="{escape_label(agent)}",event="{escape_label(event)}"'
+                lines.append(f"{prefix}_events_total{{{labels}}} {times}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, path: str) -> None:
+        """
+        Writes {path}.json and {path}.prom
+        """
+        with open(f"{path}.json", "w") as f:
+            f.write(self.to_json())
+        with open(f"{path}.prom", "w") as f:
+            f.write(self.to_prometheus())
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
@@ -0,0 +1,359 @@
+"""
+Job store of batch episodes shared by any number of worker nodes.
+
+Episodes are enqueued as jobs (scenario, problem, seed, settings) and
+claimed by workers under time-limited leases, renewed while the episode
+runs. A lease that runs out, because its node died or hung, puts the job
+back in the queue, so losing a node loses only its in-flight episodes.
+Workers need no coordination beyond the store: adding one raises
+throughput. The default store is a SQLite file, which nodes can share
+over a network filesystem.
+
+Delivery is at least once: an episode whose lease ran out just before
+it finished may also be run by another worker. Dataset records carry
+their job id so readers can drop the duplicate.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from autodebate.batch import BatchReport, BatchStats, EpisodeResult, Problem, arun_episode, plan, scenario_for
+from autodebate.dataset import DatasetWriter
+from autodebate.instrumentation import Instrumentation
+from autodebate.llm import episode_seed
+from autodebate.llm_cache import ResponseCache
+from autodebate.scenario import ScenarioSetup, agenerate_setup
+from autodebate.setup_cache import SetupCache
+
+
+@dataclass
+class EpisodeJob:
+    scenario: str
+    problem: Optional[Problem] = None
+    seed: Optional[int] = None
+    # scenario settings, model settings included, e.g. {"character_model": {"model": "gpt-4"}}
+    settings: dict = field(default_factory=dict)
+    max_iters: Optional[int] = None
+    id: Optional[int] = None
+    attempts: int = 0
+
+
+class JobStore:
+    """
+    Subclasses implement the queue operations below,
+    each one atomic across every worker of the store.
+    """
+
+    def put(self, jobs: List[EpisodeJob], seed_after_existing: bool = False) -> List[int]:
+        """
+        Queues {jobs} and returns their ids. With {seed_after_existing}
+        their seeds are offsets from one past the highest seed already
+        queued, taken in the same transaction.
+        """
+        raise NotImplementedError
+
+    def claim(self, worker: str, count: int = 1, scenario: Optional[str] = None) -> List[EpisodeJob]:
+        """
+        Leases up to {count} queued jobs to {worker}, only
+        those of {scenario} if given, requeuing expired leases first
+        """
+        raise NotImplementedError
+
+    def renew(self, worker: str, ids: List[int]) -> List[int]:
+        """
+        Extends the leases of {worker} on {ids}, returning
+        the ids it still holds
+        """
+        raise NotImplementedError
+
+    def finish(self, worker: str, id: int, error: Optional[str] = None) -> bool:
+        """
+        Marks job {id} done, or failed with {error}, returning False
+        if {worker} lost its lease in the meantime
+        """
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the number of jobs in each state
+        """
+        raise NotImplementedError
+
+    def enqueue(
+        self,
+        scenario_name: str,
+        episodes: int = 1,
+        problems: Optional[List[Problem]] = None,
+        settings: Optional[dict] = None,
+        max_iters: Optional[int] = None,
+        seed: Optional[int] = None,
+        seeded: bool = True,
+    ) -> List[int]:
+        """
+        Queues {episodes} episodes for every problem of {problems}, or of
+        the scenario's own quest, seeded from {seed} on. Without {seed}
+        the seeds continue after those already in the store, so a batch
+        queued twice does not repeat itself; unseeded without {seeded}.
+        """
+        return self.put(
+            [
+                EpisodeJob(
+                    scenario_name,
+                    problem,
+                    seed=index + (seed or 0) if seeded else None,
+                    settings=settings or {},
+                    max_iters=max_iters,
+                )
+                for index, _, problem in plan(episodes, problems)
+            ],
+            seed_after_existing=seeded and seed is None,
+        )
+
+    def pending(self) -> int:
+        counts = self.counts()
+        return counts.get("queued", 0) + counts.get("leased", 0)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+class SQLiteJobStore(JobStore):
+    def __init__(self, path: str = "jobs.sqlite", lease_seconds: float = 120.0, max_attempts: int = 3) -> None:
+        """
+        Jobs leased {max_attempts} times without finishing, or failing
+        that often, are given up as failed. Lease expiry compares the
+        clocks of the nodes, keep them in sync.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connection = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # connections must not cross a fork, reopen in the child
+        if self._pid != os.getpid():
+            # no WAL: its shared memory does not work over network filesystems
+            self._connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+            self._connection.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    def _transaction(self, operation: Callable[[sqlite3.Connection], object]):
+        with self._lock:
+            connection = self.connection
+            # takes the write lock up front, so two workers never claim the same job
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                value = operation(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return value
+
+    def put(self, jobs: List[EpisodeJob], seed_after_existing: bool = False) -> List[int]:
+        def insert(connection: sqlite3.Connection) -> List[int]:
+            base = 0
+            if seed_after_existing:
+                (highest,) = connection.execute("SELECT MAX(json_extract(job, '$.seed')) FROM jobs").fetchone()
+                base = 0 if highest is None else highest + 1
+            ids = []
+            for job in jobs:
+                if seed_after_existing and job.seed is not None:
+                    job.seed += base
+                spec = {key: value for key, value in vars(job).items() if key not in ("id", "attempts")}
+                cursor = connection.execute(
+                    "INSERT INTO jobs (job, scenario) VALUES (?, ?)", (json.dumps(spec), job.scenario)
+                )
+                ids.append(cursor.lastrowid)
+            return ids
+
+        return self._transaction(insert)
+
+    def claim(self, worker: str, count: int = 1, scenario: Optional[str] = None) -> List[EpisodeJob]:
+        def lease(connection: sqlite3.Connection) -> List[EpisodeJob]:
+            now = time.time()
+            connection.execute(
+                """
+                UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                    worker = NULL, error = 'lease expired'
+                WHERE state = 'leased' AND lease_expires < ?
+                """,
+                (self.max_attempts, now),
+            )
+            rows = connection.execute(
+                "SELECT id, job, attempts FROM jobs WHERE state = 'queued' AND (? IS NULL OR scenario = ?) "
+                "ORDER BY id LIMIT ?",
+                (scenario, scenario, count),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                [(worker, now + self.lease_seconds, id) for id, _, _ in rows],
+            )
+            return [EpisodeJob(**json.loads(job), id=id, attempts=attempts + 1) for id, job, attempts in rows]
+
+        return self._transaction(lease)
+
+    def renew(self, worker: str, ids: List[int]) -> List[int]:
+        def extend(connection: sqlite3.Connection) -> List[int]:
+            held = []
+            for id in ids:
+                cursor = connection.execute(
+                    "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                    (time.time() + self.lease_seconds, id, worker),
+                )
+                if cursor.rowcount:
+                    held.append(id)
+            return held
+
+        return self._transaction(extend)
+
+    def finish(self, worker: str, id: int, error: Optional[str] = None) -> bool:
+        def mark(connection: sqlite3.Connection) -> bool:
+            if error is None:
+                cursor = connection.execute(
+                    "UPDATE jobs SET state = 'done', worker = NULL, error = NULL "
+                    "WHERE id = ? AND worker = ? AND state = 'leased'",
+                    (id, worker),
+                )
+            else:
+                # failures are retried on any worker, up to max_attempts runs in all
+                cursor = connection.execute(
+                    "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                    "worker = NULL, error = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                    (self.max_attempts, error, id, worker),
+                )
+            return cursor.rowcount == 1
+
+        return self._transaction(mark)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+
+def default_worker() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def awork(
+    store: JobStore,
+    worker: Optional[str] = None,
+    scenario_name: Optional[str] = None,
+    concurrency: int = 8,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+    setup_cache: Optional[SetupCache] = None,
+    dataset: Optional[DatasetWriter] = None,
+    progress: Optional[Callable[[BatchStats], None]] = None,
+    poll: float = 2.0,
+    until_empty: bool = True,
+) -> BatchReport:
+    """
+    Runs jobs of {store} as {worker}, {concurrency} at a time, only
+    those of {scenario_name} if given. Returns once no job is queued or
+    leased with {until_empty}, otherwise keeps polling every {poll}
+    seconds. Leases are renewed while their episode runs; an episode
+    whose lease is lost is cancelled, another worker has it now.
+    """
+    worker = worker or default_worker()
+    lease_seconds = getattr(store, "lease_seconds", 120.0)
+    stats = BatchStats(total=0)
+    results: List[EpisodeResult] = []
+    running: Dict["asyncio.Task[EpisodeResult]", EpisodeJob] = {}
+    setups: Dict[str, "asyncio.Future[ScenarioSetup]"] = {}
+
+    async def unseeded_setup(job: EpisodeJob) -> ScenarioSetup:
+        # the task inherited the seed of the episode starting it, its setup is shared by all
+        episode_seed.set(None)
+        return await agenerate_setup(
+            scenario_for(job.scenario, job.problem, job.settings),
+            instrumentation=instrumentation,
+            cache=cache,
+            setup_cache=setup_cache,
+        )
+
+    def setup_for(job: EpisodeJob) -> "asyncio.Future[ScenarioSetup]":
+        # one setup per distinct problem on this worker, shared by its episodes
+        key = json.dumps([job.scenario, job.problem, job.settings], sort_keys=True)
+        if key not in setups:
+            setups[key] = asyncio.ensure_future(unseeded_setup(job))
+        return setups[key]
+
+    def start(job: EpisodeJob) -> None:
+        async def run() -> EpisodeResult:
+            # sent with every call of the episode, the task keeps it to itself
+            episode_seed.set(job.seed)
+            return await arun_episode(
+                EpisodeResult(job.id, job.problem),
+                job.scenario,
+                lambda: setup_for(job),
+                job.max_iters,
+                job.settings,
+                instrumentation,
+                cache,
+                dataset,
+                job=job.id,
+                seed=job.seed,
+                worker=worker,
+            )
+
+        running[asyncio.ensure_future(run())] = job
+        stats.total += 1
+
+    renewed = time.monotonic()
+    while True:
+        if len(running) < concurrency:
+            for job in await asyncio.to_thread(store.claim, worker, concurrency - len(running), scenario_name):
+                start(job)
+        if not running:
+            if until_empty and not await asyncio.to_thread(store.pending):
+                break
+            await asyncio.sleep(poll)
+            continue
+
+        done, _ = await asyncio.wait(running, timeout=poll, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            job = running.pop(task)
+            result = task.result()
+            if await asyncio.to_thread(store.finish, worker, job.id, result.error):
+                results.append(result)
+                stats.add(result)
+            else:
+                stats.total -= 1
+            if progress is not None:
+                progress(stats)
+
+        if running and time.monotonic() - renewed >= lease_seconds / 3:
+            held = set(await asyncio.to_thread(store.renew, worker, [job.id for job in running.values()]))
+            for task, job in list(running.items()):
+                if job.id not in held:
+                    task.cancel()
+                    del running[task]
+                    stats.total -= 1
+            renewed = time.monotonic()
+
+    return BatchReport(stats, sorted(results, key=lambda result: result.index))
@@ -0,0 +1,196 @@
+"""
+Chat model construction and the single call path every model call goes
+through, so instrumentation and caching apply to agents and setup alike.
+"""
+
+import asyncio
+import functools
+import os
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterator, Optional
+
+from langchain_core.messages import AIMessageChunk
+
+from autodebate import rate_limit
+from autodebate.instrumentation import Instrumentation
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+    from autodebate.llm_cache import ResponseCache
+
+
+def fake_backend() -> bool:
+    return bool(os.environ.get("AUTODEBATE_FAKE_LLM"))
+
+
+def chat_model(**kwargs) -> "BaseChatModel":
+    """
+    Returns the ChatOpenAI for {kwargs}, shared by every caller with the
+    same settings and importing the backend on first use, see clients.
+    With AUTODEBATE_FAKE_LLM set, builds a local FakeChatModel instead,
+    replying after AUTODEBATE_FAKE_LATENCY seconds.
+    """
+    if fake_backend():
+        from autodebate.fake_llm import FakeChatModel
+
+        return FakeChatModel(latency=float(os.environ.get("AUTODEBATE_FAKE_LATENCY", 0)), **kwargs)
+
+    from autodebate import clients
+
+    return clients.registry.chat_model(**kwargs)
+
+
+def replay_latency(message) -> float:
+    # seconds a replayed response waits before answering, see Cassette
+    if message is None:
+        return 0.0
+    return (getattr(message, "response_metadata", None) or {}).get("replay_latency", 0.0)
+
+
+# seed of the episode being run, sent with each of its calls, see autodebate.jobs
+episode_seed: ContextVar[Optional[int]] = ContextVar("episode_seed", default=None)
+
+
+def call_options() -> dict:
+    # per call rather than per model, so seeded episodes share their clients
+    seed = episode_seed.get()
+    return {} if seed is None else {"seed": seed}
+
+
+def send(model, messages: list, **options):
+    limiter = rate_limit.limiter
+    invoke = functools.partial(model.invoke, **options)
+    return invoke(messages) if limiter is None else limiter.call(model, messages, invoke)
+
+
+async def asend(model, messages: list, **options):
+    limiter = rate_limit.limiter
+    ainvoke = functools.partial(model.ainvoke, **options)
+    return await ainvoke(messages) if limiter is None else await limiter.acall(model, messages, ainvoke)
+
+
+def send_stream(model, messages: list, **options) -> Iterator:
+    limiter = rate_limit.limiter
+    return model.stream(messages, **options) if limiter is None else limiter.stream(model, messages, **options)
+
+
+def asend_stream(model, messages: list, **options) -> AsyncIterator:
+    limiter = rate_limit.limiter
+    return model.astream(messages, **options) if limiter is None else limiter.astream(model, messages, **options)
+
+
+def invoke(
+    model,
+    messages: list,
+    instrumentation: Optional[Instrumentation] = None,
+    agent: str = "",
+    cache: Optional["ResponseCache"] = None,
+):
+    """
+    Calls {model} on {messages}, answering from {cache} when possible
+    and recording the call when instrumented
+    """
+    timer = instrumentation.start(agent, model) if instrumentation is not None else None
+    options = call_options()
+    message = cache.get(model, messages, **options) if cache is not None else None
+    if replay_latency(message):
+        time.sleep(replay_latency(message))
+    if message is None:
+        message = send(model, messages, **options)
+        if cache is not None:
+            cache.put(model, messages, message, **options)
+    if timer is not None:
+        timer.finish(message)
+    return message
+
+
+async def ainvoke(
+    model,
+    messages: list,
+    instrumentation: Optional[Instrumentation] = None,
+    agent: str = "",
+    cache: Optional["ResponseCache"] = None,
+):
+    timer = instrumentation.start(agent, model) if instrumentation is not None else None
+    options = call_options()
+    message = cache.get(model, messages, **options) if cache is not None else None
+    if replay_latency(message):
+        await asyncio.sleep(replay_latency(message))
+    if message is None:
+        message = await asend(model, messages, **options)
+        if cache is not None:
+            cache.put(model, messages, message, **options)
+    if timer is not None:
+        timer.finish(message)
+    return message
+
+
+def stream(
+    model,
+    messages: list,
+    instrumentation: Optional[Instrumentation] = None,
+    agent: str = "",
+    cache: Optional["ResponseCache"] = None,
+    on_message: Optional[Callable] = None,
+) -> Iterator[str]:
+    """
+    Same as invoke, but yields the completion text as it arrives.
+    A cached response comes back as a single chunk. {on_message} is
+    called with the whole response once it is complete.
+    """
+    timer = instrumentation.start(agent, model) if instrumentation is not None else None
+    options = call_options()
+    message = cache.get(model, messages, **options) if cache is not None else None
+    if message is not None:
+        if replay_latency(message):
+            time.sleep(replay_latency(message))
+        if timer is not None:
+            timer.first_token()
+        yield message.content
+    else:
+        message = AIMessageChunk(content="")
+        for chunk in send_stream(model, messages, **options):
+            if timer is not None:
+                timer.first_token()
+            message += chunk
+            yield chunk.content
+        if cache is not None:
+            cache.put(model, messages, message, **options)
+    if timer is not None:
+        timer.finish(message)
+    if on_message is not None:
+        on_message(message)
+
+
+async def astream(
+    model,
+    messages: list,
+    instrumentation: Optional[Instrumentation] = None,
+    agent: str = "",
+    cache: Optional["ResponseCache"] = None,
+    on_message: Optional[Callable] = None,
+) -> AsyncIterator[str]:
+    timer = instrumentation.start(agent, model) if instrumentation is not None else None
+    options = call_options()
+    message = cache.get(model, messages, **options) if cache is not None else None
+    if message is not None:
+        if replay_latency(message):
+            await asyncio.sleep(replay_latency(message))
+        if timer is not None:
+            timer.first_token()
+        yield message.content
+    else:
+        message = AIMessageChunk(content="")
+        async for chunk in asend_stream(model, messages, **options):
+            if timer is not None:
+                timer.first_token()
+            message += chunk
+            yield chunk.content
+        if cache is not None:
+            cache.put(model, messages, message, **options)
+    if timer is not None:
+        timer.finish(message)
+    if on_message is not None:
+        on_message(message)
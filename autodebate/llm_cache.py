@@ -0,0 +1,143 @@
+"""
+Opt-in on-disk cache of chat model responses.
+
+Responses are keyed by model, temperature and the full prompt (system
+message and rendered history), stored in a SQLite file that several
+processes can share, and evicted least recently used first once the
+cache grows past its size cap. Calls sampled above {max_temperature}
+bypass the cache, since their outputs are not meant to repeat.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def model_params(model) -> dict:
+    params = {
+        "model": getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__,
+        "temperature": getattr(model, "temperature", None),
+        "max_tokens": getattr(model, "max_tokens", None),
+    }
+    # seeds and stop sequences change the completion, calls without them keep their keys
+    for name in ("seed", "stop"):
+        value = getattr(model, name, None) or (getattr(model, "model_kwargs", None) or {}).get(name)
+        if value:
+            params[name] = value
+    return params
+
+
+def response_key(model, messages: list, **params) -> str:
+    payload = {
+        **model_params(model),
+        **params,
+        "messages": [(message.type, message.content) for message in messages],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = "llm_cache.sqlite",
+        max_bytes: int = 256 * 1024 * 1024,
+        max_temperature: Optional[float] = 0.5,
+        evict_every: int = 64,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        # None caches every call, whatever its temperature
+        self.max_temperature = max_temperature
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connection = None
+        self.evict()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # connections must not cross a fork, reopen in the child
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    def cacheable(self, model) -> bool:
+        temperature = getattr(model, "temperature", None)
+        return self.max_temperature is None or temperature is None or temperature <= self.max_temperature
+
+    def key(self, model, messages: list, **params) -> str:
+        return response_key(model, messages, **params)
+
+    def get(self, model, messages: list, **params) -> Optional[AIMessage]:
+        """
+        Returns the cached response to {messages}, or None on a miss
+        """
+        if not self.cacheable(model):
+            return None
+        key = self.key(model, messages, **params)
+        with self._lock:
+            row = self.connection.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return AIMessage(content=row[0], response_metadata={"cached": True})
+
+    def put(self, model, messages: list, message, **params) -> None:
+        if not self.cacheable(model):
+            return
+        key = self.key(model, messages, **params)
+        content = message.content
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, content, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, content, len(key) + len(content.encode()), time.time()),
+            )
+            self._puts += 1
+            due = self._puts % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Drops the least recently used responses beyond {max_bytes}
+        """
+        with self._lock:
+            self.connection.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS running FROM responses
+                    ) WHERE running > ?
+                )
+                """,
+                (self.max_bytes,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM responses")
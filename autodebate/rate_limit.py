@@ -0,0 +1,346 @@
+"""
+Process-wide rate limiting of model calls, opt-in with configure_rate_limits.
+
+Every call on the shared call path (agents and setup alike) first takes
+a request and its estimated tokens from per-model token buckets, sized
+from requests and tokens per minute, and a slot under an adaptive
+concurrency limit: it grows by one per window of successful calls and
+halves on throttling (AIMD), once per burst of throttled calls. Throttled and transient failures are
+retried after a jittered exponential backoff, honouring Retry-After.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from autodebate.instrumentation import model_name, token_usage
+
+# (requests, tokens) per minute, adjust to your account's quota
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-4": (500, 10000),
+    "gpt-3.5-turbo": (3500, 200000),
+}
+
+TRANSIENT_STATUS = {408, 409, 500, 502, 503, 504}
+TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "InternalServerError"}
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0) -> None:
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> Tuple[float, float]:
+        """
+        Takes {amount} from the bucket, going into debt if needed, and
+        returns (how long to wait until that debt is paid, amount taken)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # a request bigger than the bucket waits for a full bucket
+            taken = min(amount, self.capacity)
+            self.tokens -= taken
+            return max(0.0, -self.tokens / self.rate), taken
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def classify(error: BaseException) -> Tuple[bool, bool, Optional[float]]:
+    """
+    Returns (retryable, throttled, retry_after) for a failed call
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    throttled = status == 429 or type(error).__name__ == "RateLimitError"
+    retryable = throttled or status in TRANSIENT_STATUS or type(error).__name__ in TRANSIENT_ERRORS
+    retry_after = None
+    try:
+        retry_after = float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return retryable, throttled, retry_after
+
+
+@dataclass
+class Reservation:
+    model: str
+    # estimated tokens of the call
+    tokens: float
+    # tokens taken from the bucket, at most its capacity
+    taken: float = 0.0
+    # when the call got its concurrency slot
+    entered: float = 0.0
+
+
+def wake(waiter: "asyncio.Future") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ModelLimiter:
+    """
+    Buckets and adaptive concurrency of a single model
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int],
+        tokens_per_minute: Optional[int],
+        initial_concurrency: int,
+        max_concurrency: int,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        # when concurrency was last halved, throttles of calls entered before are the same burst
+        self.decreased = float("-inf")
+        self._lock = threading.Condition()
+        # futures of async callers waiting for a slot, resolved by leave
+        self._waiters: List["asyncio.Future"] = []
+
+    def reserve(self, reservation: "Reservation") -> float:
+        wait = self.requests.reserve(1)[0] if self.requests is not None else 0.0
+        if self.tokens is not None:
+            token_wait, reservation.taken = self.tokens.reserve(reservation.tokens)
+            wait = max(wait, token_wait)
+        return wait
+
+    def _admit(self, reservation: "Reservation") -> bool:
+        # called with the lock held
+        if self.in_flight >= int(self.concurrency):
+            return False
+        self.in_flight += 1
+        reservation.entered = time.monotonic()
+        return True
+
+    def enter(self, reservation: "Reservation") -> None:
+        with self._lock:
+            while not self._admit(reservation):
+                self._lock.wait()
+
+    async def aenter(self, reservation: "Reservation") -> None:
+        while True:
+            with self._lock:
+                if self._admit(reservation):
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            await waiter
+
+    def leave(self, reservation: "Reservation", throttled: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                if reservation.entered >= self.decreased:
+                    self.concurrency = max(1.0, self.concurrency / 2)
+                    self.decreased = time.monotonic()
+            else:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._lock.notify_all()
+            waiters, self._waiters = self._waiters, []
+        # the waiters may sit on other threads' event loops
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(wake, waiter)
+            except RuntimeError:
+                # its loop is closed, nobody is waiting anymore
+                pass
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        initial_concurrency: int = 8,
+        max_concurrency: int = 64,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        completion_tokens: int = 256,
+    ) -> None:
+        """
+        {limits} maps model names to (requests, tokens) per minute, the
+        longest matching prefix wins; other models are only limited in
+        concurrency. {completion_tokens} is the completion size assumed
+        for calls without max_tokens, corrected once the usage is known.
+        """
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_tokens = completion_tokens
+        self.retries = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._models: Dict[str, ModelLimiter] = {}
+
+    def model(self, name: str) -> ModelLimiter:
+        with self._lock:
+            limiter = self._models.get(name)
+            if limiter is None:
+                matches = [prefix for prefix in self.limits if name.startswith(prefix)]
+                requests, tokens = self.limits[max(matches, key=len)] if matches else (None, None)
+                limiter = self._models[name] = ModelLimiter(
+                    requests, tokens, self.initial_concurrency, self.max_concurrency
+                )
+            return limiter
+
+    def estimate(self, model, messages: list) -> float:
+        # about 4 characters per token, as in ContextPolicy
+        prompt = sum(len(str(message.content)) for message in messages) / 4
+        return prompt + (getattr(model, "max_tokens", None) or self.completion_tokens)
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """
+        Returns how long to wait before retrying {error}, re-raising it
+        once it is not worth retrying
+        """
+        retryable, throttled, retry_after = classify(error)
+        if not retryable or attempt >= self.max_retries:
+            raise error
+        with self._lock:
+            self.retries += 1
+            self.throttled += throttled
+        # full jitter keeps many simulators from retrying in lockstep
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        return max(backoff, retry_after or 0.0)
+
+    def _finish(self, limiter: ModelLimiter, reservation: Reservation, message=None, error=None) -> None:
+        throttled = error is not None and classify(error)[1]
+        limiter.leave(reservation, throttled)
+        if message is not None and limiter.tokens is not None:
+            used = sum(token_usage(message))
+            if used:
+                # only what was taken comes back, a call over the estimate pays the difference
+                limiter.tokens.refund(reservation.taken - used)
+
+    def acquire(self, model, messages: list) -> Tuple[ModelLimiter, Reservation]:
+        reservation = Reservation(model_name(model), self.estimate(model, messages))
+        limiter = self.model(reservation.model)
+        wait = limiter.reserve(reservation)
+        if wait:
+            time.sleep(wait)
+        limiter.enter(reservation)
+        return limiter, reservation
+
+    async def aacquire(self, model, messages: list) -> Tuple[ModelLimiter, Reservation]:
+        reservation = Reservation(model_name(model), self.estimate(model, messages))
+        limiter = self.model(reservation.model)
+        wait = limiter.reserve(reservation)
+        if wait:
+            await asyncio.sleep(wait)
+        await limiter.aenter(reservation)
+        return limiter, reservation
+
+    def call(self, model, messages: list, send: Callable):
+        """
+        Calls {send} on {messages} once the limits allow, retrying it
+        """
+        attempt = 0
+        while True:
+            limiter, reservation = self.acquire(model, messages)
+            try:
+                message = send(messages)
+            except Exception as error:
+                self._finish(limiter, reservation, error=error)
+                time.sleep(self.delay(attempt, error))
+                attempt += 1
+                continue
+            except BaseException:
+                self._finish(limiter, reservation)
+                raise
+            self._finish(limiter, reservation, message)
+            return message
+
+    async def acall(self, model, messages: list, send: Callable):
+        attempt = 0
+        while True:
+            limiter, reservation = await self.aacquire(model, messages)
+            try:
+                message = await send(messages)
+            except Exception as error:
+                self._finish(limiter, reservation, error=error)
+                await asyncio.sleep(self.delay(attempt, error))
+                attempt += 1
+                continue
+            except BaseException:
+                self._finish(limiter, reservation)
+                raise
+            self._finish(limiter, reservation, message)
+            return message
+
+    def stream(self, model, messages: list, **options) -> Iterator:
+        """
+        Streams the chunks of {model}, retrying only failures before the
+        first chunk since the caller has not seen any output yet
+        """
+        attempt = 0
+        while True:
+            limiter, reservation = self.acquire(model, messages)
+            message = None
+            try:
+                for chunk in model.stream(messages, **options):
+                    message = chunk if message is None else message + chunk
+                    yield chunk
+            except Exception as error:
+                self._finish(limiter, reservation, error=error)
+                if message is not None:
+                    raise
+                time.sleep(self.delay(attempt, error))
+                attempt += 1
+                continue
+            except BaseException:
+                self._finish(limiter, reservation)
+                raise
+            self._finish(limiter, reservation, message)
+            return
+
+    async def astream(self, model, messages: list, **options) -> AsyncIterator:
+        attempt = 0
+        while True:
+            limiter, reservation = await self.aacquire(model, messages)
+            message = None
+            try:
+                async for chunk in model.astream(messages, **options):
+                    message = chunk if message is None else message + chunk
+                    yield chunk
+            except Exception as error:
+                self._finish(limiter, reservation, error=error)
+                if message is not None:
+                    raise
+                await asyncio.sleep(self.delay(attempt, error))
+                attempt += 1
+                continue
+            except BaseException:
+                self._finish(limiter, reservation)
+                raise
+            self._finish(limiter, reservation, message)
+            return
+
+
+# set by configure_rate_limits, None leaves calls unlimited
+limiter: Optional[RateLimiter] = None
+
+
+def configure_rate_limits(**settings) -> RateLimiter:
+    """
+    Rate limits every model call of the process from now on,
+    see RateLimiter for the settings
+    """
+    global limiter
+    limiter = RateLimiter(**settings)
+    return limiter
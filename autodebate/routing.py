@@ -0,0 +1,74 @@
+import difflib
+import re
+from typing import TYPE_CHECKING, Callable, Optional
+
+from autodebate.instrumentation import current_step
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+    from autodebate.agents import DialogueAgent
+
+
+class RoutingPolicy:
+    """
+    Leaves an agent's turns on its own, fast model and escalates a turn
+    to {strong} when one of the triggers below fires:
+    - wrong_answer: {verifier} rejected an answer given since the agent
+      last spoke
+    - role_violation: the agent's last message went on as another
+      speaker, even if its output guard trimmed that part
+    - repetition: the agent's last message is at least {repeat_ratio}
+      similar to one of the {window} lines before it
+    - rule: {escalate}(step, agent name) returned True
+    """
+
+    def __init__(
+        self,
+        strong: "BaseChatModel",
+        verifier: Optional[Callable[[str, str], Optional[bool]]] = None,
+        repeat_ratio: Optional[float] = 0.9,
+        window: int = 6,
+        escalate: Optional[Callable[[int, str], bool]] = None,
+    ) -> None:
+        self.strong = strong
+        self.verifier = verifier
+        self.repeat_ratio = repeat_ratio
+        self.window = window
+        self.escalate = escalate
+
+    def trigger(self, agent: "DialogueAgent") -> Optional[str]:
+        """
+        Returns the trigger escalating the next turn of {agent}, if any
+        """
+        step = current_step.get()
+        if self.escalate is not None and step is not None and self.escalate(step, agent.name):
+            return "rule"
+
+        transcript = agent.transcript
+        # only what was said since the agent last spoke
+        last = next(
+            (index for index in range(len(transcript) - 1, agent.cursor - 1, -1) if transcript.names[index] == agent.name),
+            None,
+        )
+        if self.verifier is not None:
+            since = agent.cursor if last is None else last + 1
+            if any(self.verifier(*transcript.turn(index)) is False for index in range(since, len(transcript))):
+                return "wrong_answer"
+        if last is None:
+            return None
+
+        _, message = transcript.turn(last)
+        # a guarded agent's reply was trimmed before it reached the transcript
+        if agent.spoke_as_other:
+            return "role_violation"
+        others = {name for name in transcript.names[agent.cursor :] if name != agent.name}
+        if others and re.search(rf"(?:^|\n)\s*(?:{'|'.join(map(re.escape, others))}):", message):
+            return "role_violation"
+        if self.repeat_ratio is not None:
+            for index in range(max(agent.cursor, last - self.window), last):
+                matcher = difflib.SequenceMatcher(None, transcript.turn(index)[1], message, autojunk=False)
+                # quick_ratio bounds ratio from above, skip the exact one when it cannot pass
+                if matcher.quick_ratio() >= self.repeat_ratio and matcher.ratio() >= self.repeat_ratio:
+                    return "repetition"
+        return None
@@ -0,0 +1,333 @@
+"""
+Scenarios and their setup phase.
+
+A scenario describes a debate: who takes part, the prompts that generate
+their personas and opening topic, the models everyone runs on and the
+speaking order. The setup phase turns it into a ready-to-run simulator.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from autodebate.agents import DialogueAgent
+from autodebate.console import echo
+from autodebate.context import ContextPolicy
+from autodebate.guards import OutputGuard
+from autodebate.instrumentation import Instrumentation, model_name
+from autodebate.llm import ainvoke, chat_model, invoke
+from autodebate.llm_cache import ResponseCache, model_params
+from autodebate.routing import RoutingPolicy
+from autodebate.setup_cache import SetupCache
+from autodebate.simulator import DialogueSimulator
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+@dataclass
+class ScenarioSetup:
+    character_descriptions: List[str]
+    storyteller_description: str
+    specified_quest: str
+
+
+class Scenario:
+    """
+    Subclasses fill in the settings and prompts below.
+    Any setting can be overridden per instance, e.g. Scenario(quest=...).
+    """
+
+    name = ""
+    character_names: List[str] = []
+    storyteller_name = ""
+    quest = ""
+    word_limit = 50
+    max_iters = 10
+    voice_map: Dict[str, str] = {}
+    # panel scenarios let a group answer at once, see DialogueSimulator.fan_out
+    panel = False
+    # who speaks once the verifier accepted an answer, see verifier()
+    wrap_up: List[Union[int, List[int]]] = []
+
+    # ChatOpenAI settings of the setup calls and of the agents
+    character_description_model: dict = {"temperature": 1.0}
+    storyteller_description_model: dict = {"temperature": 1.0}
+    quest_model: dict = {"temperature": 1.0}
+    character_model: dict = {"temperature": 1.0, "model": "gpt-4"}
+    storyteller_model: dict = {"temperature": 0.1}
+    # with routing, agents on another model speak on fast_model and only
+    # escalate a turn to their own model when a trigger fires, see routing_policy
+    routing = False
+    fast_model = "gpt-3.5-turbo"
+    # words per turn the system messages ask for, defaults to word_limit
+    response_word_limit: Optional[int] = None
+    # with guards, agents get max_tokens from response_word_limit (an English
+    # word is about 1.3 tokens, the rest is headroom), stop sequences on the
+    # other speakers' prefixes and their text written as others trimmed
+    guards = True
+    tokens_per_word = 2.0
+    # ContextPolicy settings bounding what each agent is sent, e.g.
+    # {"keep_last": 8, "token_budget": 2000}, None sends the whole transcript
+    context_policy: Optional[dict] = None
+
+    def __init__(self, **settings) -> None:
+        for key, value in settings.items():
+            if not hasattr(self, key):
+                raise TypeError(f"{type(self).__name__} has no setting {key!r}")
+            setattr(self, key, value)
+
+    def character_specifier_prompt(self, character_name: str) -> List[BaseMessage]:
+        raise NotImplementedError
+
+    def character_system_message(self, character_name: str, character_description: str) -> SystemMessage:
+        raise NotImplementedError
+
+    def storyteller_specifier_prompt(self) -> List[BaseMessage]:
+        raise NotImplementedError
+
+    def storyteller_system_message(self, storyteller_description: str) -> SystemMessage:
+        raise NotImplementedError
+
+    def quest_specifier_prompt(self) -> List[BaseMessage]:
+        raise NotImplementedError
+
+    def select_next_speaker(self, step: int, agents: List[DialogueAgent]) -> Union[int, List[int]]:
+        raise NotImplementedError
+
+    @property
+    def speaker_names(self) -> List[str]:
+        """
+        Everyone speaking in the simulator, agents added by arrange included
+        """
+        return [self.storyteller_name] + self.character_names
+
+    def output_guard(self, name: str) -> OutputGuard:
+        words = self.response_word_limit or self.word_limit
+        return OutputGuard(
+            [other for other in self.speaker_names if other != name], max_tokens=round(words * self.tokens_per_word)
+        )
+
+    def verifier(self) -> Optional[Callable[[str, str], Optional[bool]]]:
+        """
+        Returns a check of (name, message) that ends the episode once it
+        passes, scenarios without a checkable answer run to max_iters
+        """
+        return None
+
+    def routing_policy(
+        self, strong: "BaseChatModel", verifier: Optional[Callable[[str, str], Optional[bool]]]
+    ) -> RoutingPolicy:
+        """
+        Returns the policy escalating turns to {strong}, override it
+        to tune the triggers or add an escalate rule
+        """
+        return RoutingPolicy(strong, verifier=verifier)
+
+    def arrange(
+        self,
+        storyteller: DialogueAgent,
+        characters: List[DialogueAgent],
+        make_agent: Callable[[str, SystemMessage, dict], DialogueAgent],
+    ) -> List[DialogueAgent]:
+        """
+        Orders the agents of the simulator, scenarios with extra
+        agents build them with {make_agent}
+        """
+        return [storyteller] + characters
+
+    def describe(self, setup: ScenarioSetup) -> None:
+        echo(f"Original topic:\n{self.quest}\n")
+        echo(f"Detailed topic:\n{setup.specified_quest}\n")
+
+
+def generate_character_description(
+    scenario: Scenario,
+    character_name: str,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    character_description = invoke(
+        chat_model(**scenario.character_description_model),
+        scenario.character_specifier_prompt(character_name),
+        instrumentation,
+        f"setup: {character_name}",
+        cache,
+    ).content
+    return character_description
+
+
+async def agenerate(
+    model: "BaseChatModel",
+    prompt: List[BaseMessage],
+    semaphore: asyncio.Semaphore,
+    label: str,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    async with semaphore:
+        message = await ainvoke(model, prompt, instrumentation, label, cache)
+    return message.content
+
+
+def scenario_key(scenario: Scenario, setup_cache: SetupCache) -> str:
+    return setup_cache.key(
+        character_names=scenario.character_names,
+        storyteller_name=scenario.storyteller_name,
+        prompts=[scenario.character_specifier_prompt(character_name) for character_name in scenario.character_names]
+        + [scenario.storyteller_specifier_prompt(), scenario.quest_specifier_prompt()],
+        # as resolved by the client, a model left to its default is keyed by its name too
+        models=[
+            model_params(chat_model(**settings))
+            for settings in (
+                scenario.character_description_model,
+                scenario.storyteller_description_model,
+                scenario.quest_model,
+            )
+        ],
+    )
+
+
+async def agenerate_setup(
+    scenario: Scenario,
+    max_concurrency: int = 5,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+    setup_cache: Optional[SetupCache] = None,
+    regenerate: bool = False,
+) -> ScenarioSetup:
+    """
+    Issues the persona, storyteller and quest specifier calls concurrently,
+    at most {max_concurrency} in flight.
+    Their results are reused from {setup_cache} unless {regenerate} is set.
+    """
+    key = scenario_key(scenario, setup_cache) if setup_cache is not None else None
+    stored = None if key is None or regenerate else setup_cache.load(key)
+    if stored is not None:
+        return ScenarioSetup(**stored)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    *character_descriptions, storyteller_description, specified_quest = await asyncio.gather(
+        *[
+            agenerate(
+                chat_model(**scenario.character_description_model),
+                scenario.character_specifier_prompt(character_name),
+                semaphore,
+                f"setup: {character_name}",
+                instrumentation,
+                cache,
+            )
+            for character_name in scenario.character_names
+        ],
+        agenerate(
+            chat_model(**scenario.storyteller_description_model),
+            scenario.storyteller_specifier_prompt(),
+            semaphore,
+            "setup: storyteller",
+            instrumentation,
+            cache,
+        ),
+        agenerate(
+            chat_model(**scenario.quest_model),
+            scenario.quest_specifier_prompt(),
+            semaphore,
+            "setup: quest",
+            instrumentation,
+            cache,
+        ),
+    )
+    setup = ScenarioSetup(character_descriptions, storyteller_description, specified_quest)
+    if key is not None:
+        setup_cache.save(key, asdict(setup))
+    return setup
+
+
+def build_simulator(
+    scenario: Scenario,
+    setup: ScenarioSetup,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+) -> DialogueSimulator:
+    """
+    Builds the agents from {setup} and returns a simulator
+    that already opened with the specified quest
+    """
+
+    verifier = scenario.verifier()
+
+    def make_agent(name: str, system_message: SystemMessage, model: dict) -> DialogueAgent:
+        # summaries are written without the guard's max_tokens and stop sequences
+        summary_model = model
+        guard = None
+        if scenario.guards:
+            guard = scenario.output_guard(name)
+            # settings of the scenario win, e.g. its own max_tokens
+            model = {**guard.model_settings(), **model}
+        routing = None
+        if scenario.routing and model.get("model", scenario.fast_model) != scenario.fast_model:
+            routing = scenario.routing_policy(chat_model(**model), verifier)
+            model = {**model, "model": scenario.fast_model}
+            summary_model = {**summary_model, "model": scenario.fast_model}
+        context_policy = None
+        if scenario.context_policy is not None:
+            context_policy = ContextPolicy(**scenario.context_policy, model=chat_model(**summary_model))
+        return DialogueAgent(
+            name=name,
+            system_message=system_message,
+            model=chat_model(**model),
+            context_policy=context_policy,
+            instrumentation=instrumentation,
+            cache=cache,
+            routing=routing,
+            guard=guard,
+        )
+
+    characters = [
+        make_agent(
+            character_name,
+            scenario.character_system_message(character_name, character_description),
+            scenario.character_model,
+        )
+        for character_name, character_description in zip(
+            scenario.character_names, setup.character_descriptions
+        )
+    ]
+    storyteller = make_agent(
+        scenario.storyteller_name,
+        scenario.storyteller_system_message(setup.storyteller_description),
+        scenario.storyteller_model,
+    )
+
+    simulator = DialogueSimulator(
+        agents=scenario.arrange(storyteller, characters, make_agent),
+        selection_function=scenario.select_next_speaker,
+        verifier=verifier,
+        wrap_up=scenario.wrap_up,
+    )
+    simulator.reset()
+    # the quest was written by the quest model during setup, not by the storyteller's
+    quest_model = chat_model(**scenario.quest_model)
+    simulator.inject(
+        scenario.storyteller_name,
+        setup.specified_quest,
+        model=model_name(quest_model),
+        temperature=getattr(quest_model, "temperature", None),
+    )
+    return simulator
+
+
+async def asetup(
+    scenario: Scenario,
+    max_concurrency: int = 5,
+    regenerate: bool = False,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[ResponseCache] = None,
+    setup_cache: Optional[SetupCache] = None,
+) -> DialogueSimulator:
+    """
+    Runs the setup phase and returns a ready-to-run simulator
+    """
+    setup = await agenerate_setup(scenario, max_concurrency, instrumentation, cache, setup_cache, regenerate)
+    return build_simulator(scenario, setup, instrumentation, cache)
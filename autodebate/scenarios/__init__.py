@@ -0,0 +1,26 @@
+"""
+Registry of the bundled scenarios, each one imported only when loaded
+"""
+
+import importlib
+
+from autodebate.scenario import Scenario
+
+
+SCENARIOS = {
+    "startup-pitch": "autodebate.scenarios.startup_pitch:StartupPitch",
+    "green-tech": "autodebate.scenarios.green_tech:GreenTech",
+    "quantum-futures": "autodebate.scenarios.quantum_futures:QuantumFutures",
+    "data-lab": "autodebate.scenarios.data_lab:DataLab",
+}
+
+
+def load_scenario(name: str, **settings) -> Scenario:
+    """
+    Instantiates the scenario registered as {name}, with optional setting overrides
+    """
+    try:
+        module_name, class_name = SCENARIOS[name].split(":")
+    except KeyError:
+        raise ValueError(f"unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}") from None
+    return getattr(importlib.import_module(module_name), class_name)(**settings)
@@ -0,0 +1,204 @@
+""" 
+try to do a synthetic data generation lab in form of debate conversation
+the objectives is to make a llm smarter and learn about a topic he did not know about before
+we have to introduce a user input, and make the user learn 
+
+
+board member act as a teacher checking if the student agent understood the topic and learned something new
+the student agent is the one who is learning and asking questions
+the other agents are the one who are answering the questions
+
+agents:
+Teacher 1,2,3: gpt 4
+Student: gpt 3.5
+Supervisor: gpt 4
+
+we want gpt 3.5 to learn to solve the following problem:
+Question: Solve -42*r + 27*c = -1167 and 130*r + 4*c = 372 for r.
+Answer: 4
+"""
+
+from typing import List, Union
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from autodebate.agents import DialogueAgent
+from autodebate.console import echo
+from autodebate.scenario import Scenario, ScenarioSetup
+from autodebate.verifier import LinearSystemVerifier
+
+
+class DataLab(Scenario):
+    name = "data-lab"
+    character_names = ["Teacher 1", "Teacher 2", "Teacher 3"]
+    storyteller_name = "Supervisor"
+    external_agent = "Student"
+    quest = """
+learn to solve: -42*r + 27*c = -1167 and 130*r + 4*c = 372 for r
+"""
+    unknown = "r"
+    word_limit = 50
+    response_word_limit = 100
+    max_iters = 50
+    voice_map = {
+        "Quantum": "RW5Upv8d5GLFspVPIjtf",
+        "Historia": "GFk2K784WLOw7GTQEwm9",
+        "Futurist": "KtMt3WG0cO4TAgz9nDqQ",
+        "Student": "4fRlYdaDFNeh0oMqgBpS",
+    }
+
+    character_description_model = {"temperature": 1.0, "model": "gpt-4"}
+    storyteller_description_model = {"temperature": 1.0, "model": "gpt-4"}
+    quest_model = {"temperature": 1.0}
+    character_model = {"temperature": 1.0, "model": "gpt-4"}
+    storyteller_model = {"temperature": 1.0, "model": "gpt-4"}
+    student_model = {"temperature": 0.7, "model": "gpt-3.5-turbo"}
+
+    steps_round = [1, 0, 2, 1, 0, 3, 1, 0, 4, 1]
+    # the teachers all react to the student's latest attempt at once
+    panel_steps_round = [0, 1, [2, 3, 4], 1]
+    # the supervisor congratulates the student once the answer checks out
+    wrap_up = [0]
+
+    player_descriptor_system_message = SystemMessage(
+        content="""
+        Teacher 1, Teacher 2 and Teacher 3 are mathematicians specialized in equation solving.
+        their role is to give advice and directions to make sure the student understand how to solve the problem
+        You're limited to 100 words per response.
+        """
+    )
+
+    @property
+    def answer(self) -> str:
+        # solved from the quest, so other problems can be set through quest=...
+        return str(self.verifier().answer)
+
+    @property
+    def game_description(self) -> str:
+        return f""".
+        The participants are: {*self.character_names,}.
+        {self.storyteller_name} is a supervisor making sure the student is learning.
+        {self.external_agent} is the student who is learning to solve the problem.
+        We want the student to learn to solve the following problem: {self.quest}.
+        the answer of the problem is EXACTLY {self.answer} but never give the answer directly to the student.
+        You're limited to 100 words per response.
+        """
+
+    def character_specifier_prompt(self, character_name: str) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+            You have help the student solve the following problem and explain it: {self.quest}.
+            Please reply with a professional and concise description for each  {character_name} given your personas, in {self.word_limit} words or less. 
+            Speak directly to {character_name}.
+            Do not add anything else.
+            You're limited to 100 words per response."""
+            ),
+        ]
+
+    def character_system_message(self, character_name: str, character_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+    Your name is {character_name}. 
+    Your role and description is: {character_description}.
+    Speak in the first person from the perspective of {character_name}.
+    Do not give the answer directly to the student, but give him advice and directions to solve the problem if he's struggling.
+    Do not give him any numbers.
+    Do not change roles!
+    Do not speak from the perspective of anyone else.
+    Remember you are {character_name}, give feedback according to your role.
+    Stop speaking the moment you finish speaking from your perspective.
+    Keep you response natural like a regular conversation.
+    Do not add anything else.
+    You're limited to 100 words per response.
+    """
+            )
+        )
+
+    def storyteller_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+        Please reply with a profesionnal description of the supervisor {self.storyteller_name}, in {self.word_limit} words or less. 
+        Your role is to make sure the student is actively learning by giving directions and asking questions.
+        You are also in charge of checking the student answer, and if its correct, congrat the student and end the convo.
+        Do not speak from the perspective of anyone else.
+        Keep the conversation natural.
+        Speak directly to {self.storyteller_name}.
+        Never forget to keep your response to less than 100 words!
+        Do not add anything else.
+        You're limited to 100 words per response.
+        """
+            ),
+        ]
+
+    def storyteller_system_message(self, storyteller_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+You are the supervisor, {self.storyteller_name}. 
+Your description is as follows: {storyteller_description}.
+Keep the conversation natural.
+Never forget to keep your response to less than 100 words!
+Stop speaking the moment you finish speaking from your perspective.
+Do not add anything else.
+You're limited to 100 words per response.
+"""
+            )
+        )
+
+    def quest_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            SystemMessage(content="You can make a task more specific."),
+            HumanMessage(
+                content=f"""{self.game_description}
+        Introduce the entire debate, do not add anything else.
+        Start by asking the student to solve the following problem: {self.quest}.
+        Please reply with the specified subject in less than 100 words 
+        Do not add anything else.
+        You're limited to 100 words per response.
+        """
+            ),
+        ]
+
+    @property
+    def student_system_message(self) -> SystemMessage:
+        return SystemMessage(
+            content=f"""
+    You are the student, {self.external_agent}.
+    Your role is to learn to solve the following problem: {self.quest}.
+    Each time, solve the problem and give your answers and steps to the student.
+    You will be given advice and ask the teachers for directions.
+    You are not allowed to ask directky for the answer and you won't be given the answer directly.
+    You're limited to 100 words per response.
+    """)
+
+    def select_next_speaker(self, step: int, agents: List[DialogueAgent]) -> Union[int, List[int]]:
+        steps_round = self.panel_steps_round if self.panel else self.steps_round
+        return steps_round[step % len(steps_round)]
+
+    @property
+    def speaker_names(self) -> List[str]:
+        return [self.storyteller_name, self.external_agent] + self.character_names
+
+    def verifier(self) -> LinearSystemVerifier:
+        return LinearSystemVerifier(self.quest, self.unknown, speaker=self.external_agent)
+
+    def arrange(self, storyteller, characters, make_agent) -> List[DialogueAgent]:
+        # initiate the student agent
+        student_agent = make_agent(self.external_agent, self.student_system_message, self.student_model)
+        return [storyteller] + [student_agent] + characters
+
+    def describe(self, setup: ScenarioSetup) -> None:
+        super().describe(setup)
+        # print character descriptions
+        for character_name, character_description in zip(
+            self.character_names, setup.character_descriptions
+        ):
+            echo(f"{character_name}:\n{character_description}\n")
+
+        # print supervisor description
+        echo(f"{self.storyteller_name}:\n{setup.storyteller_description}\n")
@@ -0,0 +1,141 @@
+"""
+
+Debate on Implementing a New Green Technology in Urban Areas:
+
+Scenario: A city is considering implementing a new green technology (like solar-powered public transport).
+Eco's Stance: Advocates for the technology due to its environmental benefits.
+Techno's Stance: Discusses the tech aspects, potential challenges, and future integration with other smart city initiatives.
+Econo's Stance: Analyzes the cost, potential economic benefits, and financial feasibility of implementing this technology.
+Modera's Role: Guides the debate to cover all aspects (environmental, technological, economic), ensuring a balanced discussion.
+
+
+"""
+
+from typing import List
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from autodebate.agents import DialogueAgent
+from autodebate.scenario import Scenario
+
+
+class GreenTech(Scenario):
+    name = "green-tech"
+    character_names = ["Hugo", "James", "Maxence"]
+    storyteller_name = "Moderator"
+    quest = """
+Debate on Implementing a New Green Technology in Urban Areas:
+Scenario: A city is considering implementing a new green technology (like solar-powered public transport).
+"""
+    word_limit = 150
+    response_word_limit = 100
+    max_iters = 12
+    voice_map = {
+        "Hugo": "RW5Upv8d5GLFspVPIjtf",
+        "James": "GFk2K784WLOw7GTQEwm9",
+        "Maxence": "KtMt3WG0cO4TAgz9nDqQ",
+        "Moderator": "4fRlYdaDFNeh0oMqgBpS",
+    }
+
+    character_description_model = {"temperature": 1.0}
+    storyteller_description_model = {"temperature": 1.0}
+    quest_model = {"temperature": 1.0}
+    character_model = {"temperature": 1.0, "model": "gpt-4"}
+    storyteller_model = {"temperature": 0.1}
+
+    player_descriptor_system_message = SystemMessage(
+        content="""
+        Hugo is specialized in environmental issues, sustainability, and climate change. Advocates for eco-friendly policies and practices..
+        his role is to bring in facts about environmental impact, argues for sustainable solutions, and emphasizes the long-term benefits of eco-conscious decisions.
+        
+        James is focused on technological advancements, innovation, and the impact of tech on society. Enthusiastic about AI, IoT, and emerging tech trends.
+        his role is to highlights how technology can provide solutions, discusses the role of innovation in solving current problems, and examines the future of tech integration.
+        
+        Maxence is an expert in economics, finance, and business. Analyzes the economic implications and viability of decisions and policies.
+        his role is to examine the financial aspects, market impacts, and economic feasibility of ideas and solutions proposed in the debate.
+        """
+    )
+
+    @property
+    def game_description(self) -> str:
+        return f"""Here is the topic for the debate : {self.quest}.
+        The participants are: {*self.character_names,}.
+        The debate is moderated by, {self.storyteller_name}.
+        the moderator is designed to be neutral, ensuring a balanced and fair debate. Keeps the discussion on track, asks probing questions, and summarizes key points."""
+
+    def character_specifier_prompt(self, character_name: str) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+            You have to debate on the topic: {self.quest}.
+            Please reply with a professional and concise description for each  {character_name} given his focus and role, in {self.word_limit} words or less. 
+            Speak directly to {character_name}.
+            Do not add anything else."""
+            ),
+        ]
+
+    def character_system_message(self, character_name: str, character_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+    Your name is {character_name}. 
+    Your role and description is: {character_description}.
+    Speak in the first person from the perspective of {character_name}.
+    Do not change roles!
+    Do not speak from the perspective of anyone else.
+    DO NOT REPEAT ANYTHING THAT HAS ALREADY BEEN SAID !
+    Remember you are {character_name}, give feedback according to your role.
+    Never forget to keep your response less than 100 words!
+    Stop speaking the moment you finish speaking from your perspective.
+    Keep you response natural like a regular conversation.
+    Do not add anything else.
+    """
+            )
+        )
+
+    def storyteller_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+        Please reply with a profesionnal description of the debate moderator {self.storyteller_name}, in {self.word_limit} words or less. 
+        Speak directly to {self.storyteller_name}.
+        Do not add anything else.
+        """
+            ),
+        ]
+
+    def storyteller_system_message(self, storyteller_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+You are the debate moderator, {self.storyteller_name}. 
+Your description is as follows: {storyteller_description}.
+Do not speak from the perspective of anyone else, focus on your expertise.
+Never forget to keep your response to less than 100 words!
+Stop speaking the moment you finish speaking from your perspective.
+Do not add anything else.
+"""
+            )
+        )
+
+    def quest_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            SystemMessage(content="You can make a task more specific."),
+            HumanMessage(
+                content=f"""{self.game_description}
+        You are the debate moderator, {self.storyteller_name}. 
+        Introduce the entire debate, do not add anything else.
+        Please reply with the specified subject in less than 100 words 
+        Do not add anything else."""
+            ),
+        ]
+
+    def select_next_speaker(self, step: int, agents: List[DialogueAgent]) -> int:
+        if step % 2 == 0:
+            idx = 0
+        else:
+            idx = (step // 2) % (len(agents) - 1) + 1
+
+        return idx
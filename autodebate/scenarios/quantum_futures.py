@@ -0,0 +1,181 @@
+"""
+
+Debate Topic: "Intersecting Paths: Quantum Technology, Historical Lessons, and Our Future"
+try to make the student learn
+LLM "Quantum" (Quantum Physics Expert):
+- Description: Specializes in quantum mechanics, theoretical physics, and advanced scientific concepts. Able to explain complex theories and recent discoveries.
+- Role: Discusses the intricacies of quantum physics, its philosophical implications, and its potential future applications.
+
+LLM "Historia" (History and Culture Scholar):
+- Description: Expert in world history, cultural evolution, and historical analysis. Skilled in drawing connections between past events and current global situations.
+- Role: Provides historical context to discussions, highlights how history shapes current events, and offers insights into cultural dynamics.
+
+LLM "Futurist" (Technology and Future Trends Analyst):
+- Description: Focuses on emerging technologies, future societal trends, and speculative scenarios. Engages with ideas about how technology will shape the future.
+- Role: Projects potential future developments based on current technological trends and explores their societal and ethical implications.
+"""
+
+from typing import List
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from autodebate.agents import DialogueAgent
+from autodebate.console import echo
+from autodebate.scenario import Scenario, ScenarioSetup
+
+
+class QuantumFutures(Scenario):
+    name = "quantum-futures"
+    character_names = ["Quantum", "Historia", "Futurist"]
+    storyteller_name = "Student"
+    quest = """
+Debate Topic: "Intersecting Paths: Quantum Technology, Historical Lessons, and Our Future"
+"""
+    word_limit = 150
+    response_word_limit = 100
+    max_iters = 19
+    voice_map = {
+        "Quantum": "RW5Upv8d5GLFspVPIjtf",
+        "Historia": "GFk2K784WLOw7GTQEwm9",
+        "Futurist": "KtMt3WG0cO4TAgz9nDqQ",
+        "Student": "4fRlYdaDFNeh0oMqgBpS",
+    }
+
+    character_description_model = {"temperature": 1.0, "model": "gpt-4"}
+    storyteller_description_model = {"temperature": 1.0, "model": "gpt-4"}
+    quest_model = {"temperature": 1.0}
+    character_model = {"temperature": 1.0, "model": "gpt-4"}
+    storyteller_model = {"temperature": 1.0, "model": "gpt-4"}
+
+    player_descriptor_system_message = SystemMessage(
+        content="""
+        Quantum is in quantum mechanics, theoretical physics, and advanced scientific concepts, and he is able to explain complex theories and recent discoveries.
+        his role is to discusse the intricacies of quantum physics, its philosophical implications, and its potential future applications.
+
+        Historia is an Expert in world history, cultural evolution, and historical analysis, and he is skilled in drawing connections between past events and current global situations.
+        his role is to provide historical context to discussions, highlights how history shapes current events, and offers insights into cultural dynamics.
+        
+        Futurist is focused on emerging technologies, future societal trends, and speculative scenarios, and he engages with ideas about how technology will shape the future.
+        his role is to examine projects potential future developments based on current technological trends and explores their societal and ethical implications.
+        """
+    )
+
+    @property
+    def game_description(self) -> str:
+        return f"""Here is the topic for the debate : {self.quest}.
+        The participants are: {*self.character_names,}.
+        {self.storyteller_name} is a student who wants to learn more. he will ask questions to the participants and try to understand the topic deeper.
+        all the response should NOT exceed 100 words.
+        """
+
+    def character_specifier_prompt(self, character_name: str) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+            You have to debate on the topic: {self.quest}.
+            Please reply with a professional and concise description for each  {character_name} given your personas, in {self.word_limit} words or less. 
+            Speak directly to {character_name}.
+            Do not add anything else."""
+            ),
+        ]
+
+    def character_system_message(self, character_name: str, character_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+    Your name is {character_name}. 
+    Your role and description is: {character_description}.
+    Speak in the first person from the perspective of {character_name}.
+    Do not change roles!
+    Do not speak from the perspective of anyone else.
+    DO NOT REPEAT ANYTHING THAT HAS ALREADY BEEN SAID !
+    Remember you are {character_name}, give feedback according to your role.
+    Never forget to keep your response less than 100 words!
+    Stop speaking the moment you finish speaking from your perspective.
+    Keep you response natural like a regular conversation.
+    Do not add anything else.
+    """
+            )
+        )
+
+    def storyteller_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+        Please reply with a profesionnal description of the student {self.storyteller_name}, in {self.word_limit} words or less. 
+        Your role is to ask questions and try to learn more about the topic from a student perspective.
+        the talking order is: student ,quantum, student, historia, student, futurist, student, quantum, historia, futurist, student.
+        Ask questions wisely to the participants in order to learn more.
+        At the end say what you learned.
+        Do not speak from the perspective of anyone else.
+        Keep the conversation natural.
+        Speak directly to {self.storyteller_name}.
+        Never forget to keep your response to less than 100 words!
+        Do not add anything else.
+        """
+            ),
+        ]
+
+    def storyteller_system_message(self, storyteller_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+You are the student, {self.storyteller_name}. 
+Your description is as follows: {storyteller_description}.
+the talking order is: 
+student ,quantum, student,historia, student, futurist,student ,quantum, student,historia, student, futurist,student ,quantum, student,historia, student, futurist,student.
+So choose your questions wisely.
+Keep the conversation natural.
+At the last round (n=19, when it's the 10th time your talking, after futurist),you have to make a conclusion about what you learned.
+Stick to your role, never predict response.
+Never forget to keep your response to less than 100 words!
+Stop speaking the moment you finish speaking from your perspective.
+Do not add anything else.
+"""
+            )
+        )
+
+    def quest_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            SystemMessage(content="You can make a task more specific."),
+            HumanMessage(
+                content=f"""{self.game_description}
+        Introduce the entire debate, do not add anything else.
+        Start by asking a question to Quantum
+        Please reply with the specified subject in less than 100 words 
+        Do not add anything else."""
+            ),
+        ]
+
+    def select_next_speaker(self, step: int, agents: List[DialogueAgent]) -> int:
+        """
+        If the step is even, then select the storyteller
+        Otherwise, select the other characters in a round-robin fashion.
+
+        For example, with three characters with indices: 1 2 3
+        The storyteller is index 0.
+        Then the selected index will be as follows:
+
+        step: 0  1  2  3  4  5  6  7  8  9 10 11 12 13 14 15 16 17 18
+
+        idx:  0  1  0  2  0  3  0  1  0  2  0  3  0  1  0  2  0  3  0
+        """
+        if step % 2 == 0:
+            idx = 0
+        else:
+            idx = (step // 2) % (len(agents) - 1) + 1
+
+        return idx
+
+    def describe(self, setup: ScenarioSetup) -> None:
+        super().describe(setup)
+        # print character descriptions
+        for character_name, character_description in zip(
+            self.character_names, setup.character_descriptions
+        ):
+            echo(f"{character_name}:\n{character_description}\n")
+
+        # print student description
+        echo(f"{self.storyteller_name}:\n{setup.storyteller_description}\n")
@@ -0,0 +1,166 @@
+"""
+simulation:
+Koyan is the startup founder, he is pitching his startup idea to the juries.
+Hugo is a Venture Capitalist investor from Antler who prefer stable growth but doesnt want to invest much in one shot.
+James is another Venture Capitalist investor from Sequoia who believe that the market opportunity window is closing so he's willing to bet big and see an exit qickly.
+Maxence is a startup mentor, he is conservative so he wants the startup to survive for a long time and not taking a lot of risks with large investments.
+the juries will ask questions to the startup founder, Koyan and he needs to answer it
+simulating a real life startup pitching situation
+
+"""
+
+from typing import List, Union
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from autodebate.agents import DialogueAgent
+from autodebate.console import echo
+from autodebate.scenario import Scenario, ScenarioSetup
+
+
+class StartupPitch(Scenario):
+    name = "startup-pitch"
+    character_names = ["Hugo", "James", "Maxence"]
+    storyteller_name = "Koyan"
+    quest = """
+Mistral.ai aims to harness the transformative potential of generative AI, a technology that has demonstrated significant acceleration in capabilities, notably with the advent of tools like ChatGPT. Generative AI is poised to enhance productivity across sectors, predicted to expand from a $10 billion market in 2022 to $110 billion by 2030. However, the field is currently dominated by a few key players, primarily US-based, leading to an emerging oligopoly with significant barriers to entry including the need for extensive computational resources and experienced teams.
+
+Mistral.ai proposes to disrupt this market by adopting an open-source approach, differentiating itself from the closed-model strategies of competitors like OpenAI. This approach includes making model internals accessible for tighter integration with customer workflows, focusing on high-quality data sources, and providing strong security and privacy guarantees. Mistral.ai plans to train state-of-the-art models, offering them under both open-source licenses and negotiated access for specialized models.
+
+The business plan outlines a roadmap starting with the training of competitive open-source models by the end of 2023, which will outperform existing solutions like ChatGPT 3.5. This initial phase will also include the development of semantic embedding models and multimodal plugins. By Q2 2024, Mistral.ai aims to offer the best open-source text-generative models and establish commercial relationships with major industrial actors. Long-term goals include developing models small enough to run on personal devices and incorporating hot-pluggable extra-context to merge language models with retriever systems.
+
+The founding team comprises leading researchers and entrepreneurs with a strong European focus, intending to leverage this talent pool to establish Mistral.ai as a European leader in AI. The company plans to secure high-quality datasets and computational resources for model training, emphasizing efficiency and cost-effectiveness.
+
+Mistral.ai's business development strategy involves co-building integrated solutions with European industry clients and integrators, focusing initially on large industrial actors. The goal is to become the main tool for companies seeking to leverage AI in Europe, with an emphasis on safety and the ethical use of AI technologies.
+
+In summary, Mistral.ai's strategic plan revolves around leveraging open-source approaches and European talent to develop superior generative AI models, with a focus on privacy, security, and integration flexibility, aiming to disrupt the current market dynamics and establish a strong European presence in the AI industry.
+
+"""
+    word_limit = 50
+    max_iters = 11
+    voice_map = {
+        "Hugo": "RW5Upv8d5GLFspVPIjtf",
+        "James": "GFk2K784WLOw7GTQEwm9",
+        "Maxence": "KtMt3WG0cO4TAgz9nDqQ",
+        "Koyan": "4fRlYdaDFNeh0oMqgBpS",
+    }
+
+    character_description_model = {"temperature": 1.0}
+    storyteller_description_model = {"temperature": 1.0}
+    quest_model = {"temperature": 1.0}
+    character_model = {"temperature": 1.0, "model": "gpt-4"}
+    storyteller_model = {"temperature": 0.1}
+
+    order = [0, 1, 0, 2, 0, 3, 0, 1, 0, 2, 0, 3, 0]
+    # the juries ask their questions together, Koyan answers them all
+    panel_order = [0, [1, 2, 3], 0, [1, 2, 3], 0]
+
+    player_descriptor_system_message = SystemMessage(
+        content="""
+        Hugo is a Venture Capitalist investor from Antler who prefer stable growth but doesnt want to invest much in one shot.
+        James is another Venture Capitalist investor from Sequoia who believe that the market opportunity window is closing so he's willing to bet big and see an exit qickly.
+        Maxence is a startup mentor, he is conservative so he wants the startup to survive for a long time and not taking a lot of risks with large investments.
+        """
+    )
+
+    def __init__(self, **settings) -> None:
+        super().__init__(**settings)
+        if self.panel and "max_iters" not in settings:
+            # step 0 is the pitch itself
+            self.max_iters = len(self.panel_order) - 2
+
+    @property
+    def game_description(self) -> str:
+        return f"""Here is the topic for the startup : {self.quest}.
+        The juries are: {*self.character_names,}.
+        The startup is pitched by, {self.storyteller_name}."""
+
+    def character_specifier_prompt(self, character_name: str) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+            You have to answer the questions from the jury
+            Please reply with a professional and concise description for each  {character_name} given his focus and role, in {self.word_limit} words or less. 
+            Speak directly to {character_name}.
+            Do not add anything else."""
+            ),
+        ]
+
+    def character_system_message(self, character_name: str, character_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+    Your name is {character_name}. 
+    Your role and description is: {character_description}.
+    You will ask questions to the startup founder, {self.storyteller_name}.
+    You will critisize the startup idea and make a conclusion at your 3rd turn, if you will invest or not and, and give personal suggestions for the startup.
+    Speak in the first person from the perspective of {character_name}.
+    Do not change roles!
+    Do not speak from the perspective of anyone else.
+    DO NOT REPEAT ANYTHING THAT HAS ALREADY BEEN SAID !
+    Remember you are {character_name}, give feedback according to your role.
+    Stop speaking the moment you finish speaking from your perspective.
+    Never forget to keep your response to 50 words!
+    Keep you response natural like a regular conversation.
+    Do not add anything else.
+    """
+            )
+        )
+
+    def storyteller_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            self.player_descriptor_system_message,
+            HumanMessage(
+                content=f"""{self.game_description}
+        Please reply with a profesionnal description of the startup founder, {self.storyteller_name}, in {self.word_limit} words or less. 
+        Speak directly to {self.storyteller_name}.
+        Do not add anything else.
+        """
+            ),
+        ]
+
+    def storyteller_system_message(self, storyteller_description: str) -> SystemMessage:
+        return SystemMessage(
+            content=(
+                f"""{self.game_description}
+You are the startup founder, {self.storyteller_name}. 
+Your description is as follows: {storyteller_description}.
+The other juries will critisize your startup idea.
+Speak in the first person from the perspective of your startup.
+Each jury will have 3 turns and decide if they will invest or not and give you suggestions.
+Do not speak from the perspective of anyone else, focus on your expertise.
+Stop speaking the moment you finish speaking from your perspective.
+Never forget to keep your response to 50 words!
+Do not add anything else.
+Keep you response natural like a regular conversation.
+"""
+            )
+        )
+
+    def quest_specifier_prompt(self) -> List[BaseMessage]:
+        return [
+            SystemMessage(content="You can make a task more specific."),
+            HumanMessage(
+                content=f"""{self.game_description}
+        You are the startup founder, {self.storyteller_name}. 
+        Introduce the entire startup idea, do not miss any details.
+        Please reply with the specified subject in {self.word_limit} words or less. 
+        Do not add anything else."""
+            ),
+        ]
+
+    def select_next_speaker(self, step: int, agents: List[DialogueAgent]) -> Union[int, List[int]]:
+        return (self.panel_order if self.panel else self.order)[step]
+
+    def describe(self, setup: ScenarioSetup) -> None:
+        echo("Startup founder Description:")
+        echo(setup.storyteller_description)
+        for character_name, character_description in zip(
+            self.character_names, setup.character_descriptions
+        ):
+            echo(f"{character_name}: {character_description}")
+
+        super().describe(setup)
+        echo(f"({self.storyteller_name}): {setup.specified_quest}")
+        echo("\n")
@@ -0,0 +1,57 @@
+"""
+Cache of scenario setup artifacts: persona descriptions, storyteller
+description and specified quest.
+
+They only depend on the scenario, so they are stored as one JSON file
+per scenario hash and reused by later runs until explicitly regenerated.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+
+
+def encode(value):
+    # messages hash by their type and content
+    if hasattr(value, "type") and hasattr(value, "content"):
+        return [value.type, value.content]
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    return value
+
+
+class SetupCache:
+    def __init__(self, directory: str = ".setup_cache") -> None:
+        self.directory = directory
+
+    def key(self, **scenario) -> str:
+        """
+        Hashes everything the setup artifacts are generated from,
+        e.g. the names and the specifier prompts
+        """
+        payload = json.dumps(encode(scenario), sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, key: str, artifacts: dict) -> None:
+        """
+        Writes the artifacts atomically, concurrent episodes never read half a file
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(artifacts, f, indent=2)
+        os.replace(tmp, self.path(key))
@@ -0,0 +1,301 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Sequence, Union
+
+from langchain_core.messages import SystemMessage
+
+from autodebate.agents import DialogueAgent
+from autodebate.instrumentation import current_step, model_name
+from autodebate.transcript import Transcript
+
+
+@dataclass
+class Turn:
+    step: int
+    name: str
+    message: str
+    # verifier outcome, None without a verifier or an answer to check
+    verified: Optional[bool] = None
+    # the model that generated the message, which routing may have escalated
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+
+
+class DialogueSimulator:
+    def __init__(
+        self,
+        agents: List[DialogueAgent],
+        selection_function: Callable[[int, List[DialogueAgent]], Union[int, Sequence[int]]],
+        verifier: Optional[Callable[[str, str], Optional[bool]]] = None,
+        wrap_up: Sequence[Union[int, Sequence[int]]] = (),
+    ) -> None:
+        """
+        {selection_function} returns the index of the next speaker, or a
+        list of indices for a fan-out step where they all answer at once.
+        {verifier} checks every (name, message); once it accepts one, the
+        speakers of {wrap_up} get a last word each and the episode is done.
+        """
+        self.agents = agents
+        self.transcript = Transcript()
+        for agent in self.agents:
+            agent.transcript = self.transcript
+            agent.reset()
+        self._step = 0
+        self.select_next_speaker = selection_function
+        self.verifier = verifier
+        self.wrap_up = wrap_up
+        self.verified_step: Optional[int] = None
+        # every message of the episode, e.g. for DatasetWriter
+        self.turns: List[Turn] = []
+
+    def reset(self):
+        self.transcript.reset()
+        for agent in self.agents:
+            agent.reset()
+        self.verified_step = None
+        self.turns = []
+
+    def state(self) -> dict:
+        """
+        Everything a resumed simulator needs besides its models,
+        see restore and autodebate.checkpoint
+        """
+        return {
+            "step": self._step,
+            "verified_step": self.verified_step,
+            "turns": [asdict(turn) for turn in self.turns],
+            "agents": [
+                {
+                    "name": agent.name,
+                    "system_message": agent.system_message.content,
+                    "cursor": agent.cursor,
+                    "summarized": agent.summarized,
+                    "summary": agent.summary,
+                    "spoke_as_other": agent.spoke_as_other,
+                }
+                for agent in self.agents
+            ],
+        }
+
+    def restore(self, state: dict) -> None:
+        """
+        Continues from a {state} saved by a simulator with the same agents
+        """
+        names = [agent["name"] for agent in state["agents"]]
+        if names != [agent.name for agent in self.agents]:
+            raise ValueError(f"the saved agents {names} do not match {[agent.name for agent in self.agents]}")
+
+        self.transcript.reset()
+        self.turns = [Turn(**turn) for turn in state["turns"]]
+        # every turn is one transcript line
+        for turn in self.turns:
+            self.transcript.append(turn.name, turn.message)
+        for agent, saved in zip(self.agents, state["agents"]):
+            agent.system_message = SystemMessage(content=saved["system_message"])
+            agent.cursor = saved["cursor"]
+            agent.summarized = saved["summarized"]
+            agent.summary = saved["summary"]
+            agent.spoke_as_other = saved.get("spoke_as_other", False)
+        self._step = state["step"]
+        self.verified_step = state["verified_step"]
+
+    @property
+    def done(self) -> bool:
+        return self.verified_step is not None and self._step > self.verified_step + len(self.wrap_up)
+
+    def _select(self) -> Union[int, Sequence[int]]:
+        if self.verified_step is None:
+            return self.select_next_speaker(self._step, self.agents)
+        if self.done:
+            raise RuntimeError(f"the episode ended after the answer was verified at step {self.verified_step}")
+        return self.wrap_up[self._step - self.verified_step - 1]
+
+    def _receive(self, name: str, message: str) -> None:
+        self.transcript.append(name, message)
+        verified = None if self.verifier is None else self.verifier(name, message)
+        speaker = next((agent for agent in self.agents if agent.name == name), None)
+        model = speaker.last_model if speaker is not None else None
+        self.turns.append(
+            Turn(
+                self._step,
+                name,
+                message,
+                verified,
+                model=model_name(model) if model is not None else None,
+                temperature=getattr(model, "temperature", None),
+            )
+        )
+        if verified and self.verified_step is None:
+            self.verified_step = self._step
+
+    def inject(self, name: str, message: str, model: Optional[str] = None, temperature: Optional[float] = None):
+        """
+        Initiates the conversation with a {message} from {name},
+        generated by {model} if any
+        """
+        self.transcript.append(name, message)
+        self.turns.append(Turn(self._step, name, message, model=model, temperature=temperature))
+
+        # increment time
+        self._step += 1
+
+    def step(self) -> Union[tuple[str, str], List[tuple[str, str]]]:
+        # 1. choose the next speaker
+        speaker_idx = self._select()
+        if not isinstance(speaker_idx, int):
+            return self.fan_out(speaker_idx)
+        speaker = self.agents[speaker_idx]
+
+        # 2. next speaker sends message
+        context = current_step.set(self._step)
+        try:
+            message = speaker.send()
+        finally:
+            current_step.reset(context)
+
+        # 3. everyone receives message through the shared transcript
+        self._receive(speaker.name, message)
+
+        # 4. increment time
+        self._step += 1
+
+        return speaker.name, message
+
+    def fan_out(self, speaker_idxs: Sequence[int]) -> List[tuple[str, str]]:
+        """
+        Lets every speaker of {speaker_idxs} answer the same history
+        concurrently, none of them sees the others' messages.
+        The messages join the transcript in the order of {speaker_idxs}
+        and the whole group counts as a single step.
+        """
+        speakers = [self.agents[speaker_idx] for speaker_idx in speaker_idxs]
+
+        # 2. every speaker sends its message against the same snapshot
+        context = current_step.set(self._step)
+        try:
+            with ThreadPoolExecutor(max_workers=len(speakers)) as executor:
+                # threads do not inherit context variables, copy them over
+                futures = [executor.submit(contextvars.copy_context().run, speaker.send) for speaker in speakers]
+                messages = [future.result() for future in futures]
+        finally:
+            current_step.reset(context)
+
+        # 3. everyone receives the messages through the shared transcript
+        for speaker, message in zip(speakers, messages):
+            self._receive(speaker.name, message)
+
+        # 4. increment time
+        self._step += 1
+
+        return [(speaker.name, message) for speaker, message in zip(speakers, messages)]
+
+    async def astep(self) -> Union[tuple[str, str], List[tuple[str, str]]]:
+        # 1. choose the next speaker
+        speaker_idx = self._select()
+        if not isinstance(speaker_idx, int):
+            return await self.afan_out(speaker_idx)
+        speaker = self.agents[speaker_idx]
+
+        # 2. next speaker sends message, without blocking the event loop
+        context = current_step.set(self._step)
+        try:
+            message = await speaker.asend()
+        finally:
+            current_step.reset(context)
+
+        # 3. everyone receives message through the shared transcript
+        self._receive(speaker.name, message)
+
+        # 4. increment time
+        self._step += 1
+
+        return speaker.name, message
+
+    async def afan_out(self, speaker_idxs: Sequence[int]) -> List[tuple[str, str]]:
+        speakers = [self.agents[speaker_idx] for speaker_idx in speaker_idxs]
+
+        # 2. every speaker sends its message against the same snapshot
+        context = current_step.set(self._step)
+        try:
+            messages = await asyncio.gather(*[speaker.asend() for speaker in speakers])
+        finally:
+            current_step.reset(context)
+
+        # 3. everyone receives the messages through the shared transcript
+        for speaker, message in zip(speakers, messages):
+            self._receive(speaker.name, message)
+
+        # 4. increment time
+        self._step += 1
+
+        return [(speaker.name, message) for speaker, message in zip(speakers, messages)]
+
+    def step_stream(self) -> Iterator[tuple[str, str]]:
+        """
+        Same as step, but yields (name, token) while the speaker talks.
+        The message joins the transcript once it is complete.
+        A fan-out step yields each message whole once the group is done.
+        """
+        # 1. choose the next speaker
+        speaker_idx = self._select()
+        if not isinstance(speaker_idx, int):
+            yield from self.fan_out(speaker_idx)
+            return
+        speaker = self.agents[speaker_idx]
+
+        # 2. next speaker streams its message
+        tokens = []
+        context = current_step.set(self._step)
+        try:
+            for token in speaker.send_stream():
+                tokens.append(token)
+                yield speaker.name, token
+        finally:
+            current_step.reset(context)
+
+        # 3. everyone receives message through the shared transcript
+        self._receive(speaker.name, "".join(tokens))
+
+        # 4. increment time
+        self._step += 1
+
+    async def astep_stream(self) -> AsyncIterator[tuple[str, str]]:
+        # 1. choose the next speaker
+        speaker_idx = self._select()
+        if not isinstance(speaker_idx, int):
+            for name, message in await self.afan_out(speaker_idx):
+                yield name, message
+            return
+        speaker = self.agents[speaker_idx]
+
+        # 2. next speaker streams its message
+        tokens = []
+        context = current_step.set(self._step)
+        try:
+            async for token in speaker.asend_stream():
+                tokens.append(token)
+                yield speaker.name, token
+        finally:
+            current_step.reset(context)
+
+        # 3. everyone receives message through the shared transcript
+        self._receive(speaker.name, "".join(tokens))
+
+        # 4. increment time
+        self._step += 1
+
+    async def arun(self, max_iters: int) -> List[tuple[str, str]]:
+        """
+        Runs {max_iters} steps, or until the episode is done,
+        and returns every (name, message) spoken.
+        Many simulators can be gathered on a single event loop.
+        """
+        spoken = []
+        for _ in range(max_iters):
+            if self.done:
+                break
+            turn = await self.astep()
+            spoken.extend(turn if isinstance(turn, list) else [turn])
+        return spoken
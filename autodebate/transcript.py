@@ -0,0 +1,62 @@
+import io
+from typing import List, Optional, Tuple
+
+
+class Transcript:
+    """
+    Append-only record of the conversation, shared by every agent
+    of a simulator so each turn is formatted and stored only once
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def reset(self):
+        # offsets[i] is where line i starts in the rendered text
+        self.offsets: List[int] = []
+        # names[i] spoke line i
+        self.names: List[str] = []
+        self._size = 0
+        self._buffer = io.StringIO()
+        self._rendered: Optional[str] = ""
+
+    @property
+    def lines(self) -> List[str]:
+        text = self.render()
+        ends = self.offsets[1:] + [self._size]
+        return [text[start:end - 1] for start, end in zip(self.offsets, ends)]
+
+    def append(self, name: str, message: str) -> None:
+        """
+        Formats {message} spoken by {name} and appends it to the transcript
+        """
+        line = f"{name}: {message}\n"
+        self.offsets.append(self._size)
+        self.names.append(name)
+        self._buffer.write(line)
+        self._size += len(line)
+        self._rendered = None
+
+    def turn(self, index: int) -> Tuple[str, str]:
+        """
+        Returns the (name, message) of line {index}
+        """
+        name = self.names[index]
+        end = self.offsets[index + 1] if index + 1 < len(self.offsets) else self._size
+        return name, self.render()[self.offsets[index] + len(name) + 2 : end - 1]
+
+    def render(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Returns the lines from {start} up to {end}, each ending with a newline.
+        The buffer is only read back once per append, whoever asks for it.
+        """
+        if self._rendered is None:
+            self._rendered = self._buffer.getvalue()
+        if start >= len(self.offsets):
+            return ""
+        if end is None or end >= len(self.offsets):
+            return self._rendered[self.offsets[start]:] if start else self._rendered
+        return self._rendered[self.offsets[start]:self.offsets[end]]
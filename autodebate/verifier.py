@@ -0,0 +1,98 @@
+"""
+Local answer checks, so an episode can end as soon as it is solved
+instead of waiting for a model to notice.
+
+A verifier is any callable taking (name, message) and returning True
+once {message} holds a correct answer, False for a wrong one and None
+when there is no answer to check, see DialogueSimulator.
+"""
+
+import re
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple
+
+NUMBER = r"\d+(?:\.\d+)?"
+# a term such as -42*r, + 27c or r, a lone letter in the middle of a word is not one
+TERM = rf"[-+]?\s*(?:{NUMBER}\s*\*?\s*)?(?<![A-Za-z])[A-Za-z]\b"
+EQUATION = re.compile(rf"((?:{TERM}\s*)+)=\s*([-+]?\s*{NUMBER})")
+TERM_PARTS = re.compile(rf"([-+]?)\s*({NUMBER})?\s*\*?\s*([A-Za-z])\b")
+
+Equation = Tuple[Dict[str, Fraction], Fraction]
+
+
+def parse_linear_system(text: str) -> List[Equation]:
+    """
+    Finds the linear equations written in {text}, e.g.
+    "-42*r + 27*c = -1167 and 130*r + 4*c = 372", as
+    ({variable: coefficient}, constant) pairs
+    """
+    equations = []
+    for lhs, rhs in EQUATION.findall(text):
+        coefficients: Dict[str, Fraction] = {}
+        for sign, number, variable in TERM_PARTS.findall(lhs):
+            coefficient = Fraction(number) if number else Fraction(1)
+            coefficients[variable] = coefficients.get(variable, Fraction(0)) + (
+                -coefficient if sign == "-" else coefficient
+            )
+        equations.append((coefficients, Fraction(rhs.replace(" ", ""))))
+    return equations
+
+
+def solve_linear_system(equations: List[Equation]) -> Dict[str, Fraction]:
+    """
+    Solves {equations} exactly by Gaussian elimination over fractions
+    """
+    variables = sorted({variable for coefficients, _ in equations for variable in coefficients})
+    rows = [[coefficients.get(variable, Fraction(0)) for variable in variables] + [constant] for coefficients, constant in equations]
+    if len(rows) < len(variables):
+        raise ValueError(f"{len(rows)} equations cannot determine {len(variables)} unknowns")
+
+    for column in range(len(variables)):
+        pivot = next((row for row in range(column, len(rows)) if rows[row][column] != 0), None)
+        if pivot is None:
+            raise ValueError("the system has no unique solution")
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for row in range(len(rows)):
+            if row != column and rows[row][column] != 0:
+                factor = rows[row][column] / rows[column][column]
+                rows[row] = [value - factor * pivot_value for value, pivot_value in zip(rows[row], rows[column])]
+
+    return {variable: rows[column][-1] / rows[column][column] for column, variable in enumerate(variables)}
+
+
+def claimed_value(message: str, variable: str) -> Optional[Fraction]:
+    """
+    Returns the last value {message} assigns to {variable}, as in
+    "r = 4", "r: 4", "r is -3/2" or "**r = 4**", ignoring expressions
+    like "r = (372 - 4c)/130"
+    """
+    # markdown emphasis around the claim, the variable or the value is closed by the same marker
+    pattern = (
+        rf"(?<![A-Za-z])(?P<outer>[*_]*){re.escape(variable)}(?P=outer)?\s*(?:=|:|is|equals)\s*(?P<inner>[*_]*)"
+        rf"(?P<value>-?\s*{NUMBER}(?:\s*/\s*\d+)?)(?:(?P=inner)|(?P=outer))?(?!\s*[-+*/^(])(?![\d.]*\w)"
+    )
+    claims = [match.group("value") for match in re.finditer(pattern, message)]
+    if not claims:
+        return None
+    return Fraction(re.sub(r"\s+", "", claims[-1]))
+
+
+class LinearSystemVerifier:
+    """
+    Accepts the first message of {speaker} claiming the exact value of
+    {variable} in the linear system written in {problem}
+    """
+
+    def __init__(self, problem: str, variable: str, speaker: Optional[str] = None) -> None:
+        self.variable = variable
+        self.speaker = speaker
+        solution = solve_linear_system(parse_linear_system(problem))
+        if variable not in solution:
+            raise ValueError(f"{variable!r} is not an unknown of a linear system in {problem.strip()!r}")
+        self.answer = solution[variable]
+
+    def __call__(self, name: str, message: str) -> Optional[bool]:
+        if self.speaker is not None and name != self.speaker:
+            return None
+        claimed = claimed_value(message, self.variable)
+        return None if claimed is None else claimed == self.answer
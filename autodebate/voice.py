@@ -0,0 +1,175 @@
+"""
+Text to speech through elevenlabs, imported only when a voice is read.
+The API key is taken from ELEVEN_API_KEY.
+"""
+
+import os
+import queue
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from autodebate.console import echo
+
+
+_api_key_set = False
+
+
+def _set_api_key() -> None:
+    global _api_key_set
+    from elevenlabs import set_api_key
+
+    if not _api_key_set and os.environ.get("ELEVEN_API_KEY"):
+        set_api_key(os.environ["ELEVEN_API_KEY"])
+        _api_key_set = True
+
+
+def synthesize_elevenlabs(voice_id: str, text: str, **settings) -> bytes:
+    from elevenlabs import Voice, generate
+
+    _set_api_key()
+    return generate(
+        text=text,
+        voice=Voice(voice_id=f"{voice_id}"),
+        **settings,
+    )
+
+
+def play_elevenlabs(audio: bytes) -> None:
+    from elevenlabs import play
+
+    play(audio)
+
+
+def read_voice(
+    voice_map: Dict[str, str],
+    name: str,
+    message: str,
+    synthesize: Optional[Callable[[str, str], bytes]] = None,
+) -> None:
+    """
+    Synthesizes and plays {message} before returning
+    """
+    echo("")
+    play_elevenlabs((synthesize or synthesize_elevenlabs)(voice_map[name], message))
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits {text} after every sentence end, the last piece
+    may still be an unfinished sentence
+    """
+    return re.split(r"(?<=[.!?])\s+", text)
+
+
+_DONE = object()
+
+
+class VoicePipeline:
+    """
+    Reads messages aloud in the background: one thread synthesizes
+    sentences, another plays the clips in order. The debate moves on to its
+    next turn while the current clip plays, and only waits once
+    {max_messages} messages are queued but not yet fully played.
+    """
+
+    def __init__(
+        self,
+        voice_map: Dict[str, str],
+        max_messages: int = 2,
+        max_clips: int = 8,
+        synthesize: Optional[Callable[[str, str], bytes]] = None,
+        play: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
+        self.voice_map = voice_map
+        self.synthesize = synthesize or synthesize_elevenlabs
+        self.play = play or play_elevenlabs
+        self._messages = threading.Semaphore(max_messages)
+        self._sentences: queue.Queue = queue.Queue()
+        self._clips: queue.Queue = queue.Queue(maxsize=max_clips)
+        # partial sentence of every message being fed
+        self._pending: Dict[str, str] = {}
+        self._error: Optional[BaseException] = None
+        self._synthesizer = threading.Thread(target=self._synthesize_loop, daemon=True)
+        self._player = threading.Thread(target=self._play_loop, daemon=True)
+        self._synthesizer.start()
+        self._player.start()
+
+    def __enter__(self) -> "VoicePipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def say(self, name: str, message: str) -> None:
+        self.feed(name, message)
+        self.flush(name)
+
+    def feed(self, name: str, text: str) -> None:
+        """
+        Buffers streamed {text} spoken by {name} and queues
+        every sentence it completes
+        """
+        self._raise()
+        if name not in self._pending:
+            self._messages.acquire()
+            self._pending[name] = ""
+        *sentences, rest = split_sentences(self._pending[name] + text)
+        for sentence in sentences:
+            if sentence.strip():
+                self._sentences.put((name, sentence, False))
+        self._pending[name] = rest
+
+    def flush(self, name: str) -> None:
+        """
+        Ends the message of {name}, queueing whatever is left of it
+        """
+        if name in self._pending:
+            self._sentences.put((name, self._pending.pop(name).strip(), True))
+
+    def close(self) -> None:
+        """
+        Waits until everything queued has been played
+        """
+        for name in list(self._pending):
+            self.flush(name)
+        self._sentences.put(_DONE)
+        self._synthesizer.join()
+        self._player.join()
+        self._raise()
+
+    def _raise(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _synthesize_loop(self) -> None:
+        while True:
+            item = self._sentences.get()
+            if item is _DONE:
+                self._clips.put(_DONE)
+                return
+            name, sentence, last = item
+            audio = None
+            # speakers without a voice stay silent
+            voice_id = self.voice_map.get(name)
+            if sentence and voice_id is not None:
+                try:
+                    audio = self.synthesize(voice_id, sentence)
+                except Exception as error:
+                    self._error = error
+            self._clips.put((audio, last))
+
+    def _play_loop(self) -> None:
+        while True:
+            item = self._clips.get()
+            if item is _DONE:
+                return
+            audio, last = item
+            if audio is not None:
+                try:
+                    self.play(audio)
+                except Exception as error:
+                    self._error = error
+            if last:
+                self._messages.release()
@@ -0,0 +1,209 @@
+"""
+Process pool mode of the batch runner.
+
+The parent generates each problem's setup once, then shards the episodes
+over worker processes. Each worker runs its own event loop of simulators
+(arun_jobs) and writes its own dataset shards, named worker-NNN-*. Its
+progress streams back to the parent. Once all workers are done, their
+shards, stats, failures and call metrics are merged into one manifest.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from autodebate.batch import BatchReport, BatchStats, EpisodeResult, Job, Problem, agenerate_setups, arun_jobs, plan
+from autodebate.dataset import DatasetWriter
+from autodebate.instrumentation import Instrumentation
+from autodebate.llm_cache import ResponseCache
+from autodebate.scenario import ScenarioSetup
+from autodebate.setup_cache import SetupCache
+
+
+@dataclass
+class WorkerConfig:
+    worker: int
+    scenario_name: str
+    jobs: List[Job]
+    setups: Dict[int, ScenarioSetup]
+    concurrency: int
+    max_iters: Optional[int]
+    settings: Optional[dict]
+    dataset: Optional[str]
+    chat_speaker: Optional[str]
+    cache: Optional[str]
+    # this worker's share of the rate limits, None for no limits
+    rate_limit_share: Optional[float]
+
+
+def work(config: WorkerConfig, results: "queue.Queue") -> dict:
+    """
+    Runs in a worker process: the episodes of {config.jobs}, putting
+    every EpisodeResult on {results} as it finishes
+    """
+    if config.rate_limit_share is not None:
+        from autodebate.rate_limit import DEFAULT_LIMITS, configure_rate_limits
+
+        configure_rate_limits(
+            limits={
+                model: (requests * config.rate_limit_share, tokens * config.rate_limit_share)
+                for model, (requests, tokens) in DEFAULT_LIMITS.items()
+            }
+        )
+    instrumentation = Instrumentation(keep_calls=False)
+    dataset = (
+        DatasetWriter(config.dataset, prefix=f"worker-{config.worker:03d}", chat_speaker=config.chat_speaker)
+        if config.dataset
+        else None
+    )
+    try:
+        report = asyncio.run(
+            arun_jobs(
+                config.scenario_name,
+                config.jobs,
+                config.concurrency,
+                config.max_iters,
+                config.settings,
+                instrumentation,
+                ResponseCache(config.cache) if config.cache else None,
+                dataset=dataset,
+                setups=config.setups,
+                on_result=results.put,
+            )
+        )
+    finally:
+        if dataset is not None:
+            dataset.close()
+    return {
+        "worker": config.worker,
+        "stats": report.stats.to_dict(),
+        "shards": dataset.closed if dataset is not None else [],
+        "totals": instrumentation.totals(),
+    }
+
+
+def write_manifest(path: str, manifest: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def run_pool(
+    scenario_name: str,
+    episodes: int = 1,
+    problems: Optional[List[Problem]] = None,
+    processes: Optional[int] = None,
+    concurrency: int = 8,
+    max_iters: Optional[int] = None,
+    settings: Optional[dict] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    cache: Optional[str] = None,
+    setup_cache: Optional[SetupCache] = None,
+    dataset: Optional[str] = None,
+    chat_speaker: Optional[str] = None,
+    rate_limit: bool = False,
+    progress: Optional[Callable[[BatchStats], None]] = None,
+) -> BatchReport:
+    """
+    Same as arun_batch, with the episodes spread over {processes} worker
+    processes (one per core by default), each running {concurrency}
+    episodes at once. {cache} is the path of a ResponseCache the workers
+    share. With {dataset}, its manifest.json lists every shard written.
+    """
+    processes = processes or os.cpu_count() or 1
+    jobs = plan(episodes, problems)
+    setups = asyncio.run(
+        agenerate_setups(
+            scenario_name,
+            jobs,
+            settings,
+            instrumentation,
+            ResponseCache(cache) if cache else None,
+            setup_cache,
+        )
+    )
+    # round robin, so every worker gets a mix of problems
+    shards = [shard for shard in (jobs[worker::processes] for worker in range(processes)) if shard]
+
+    stats = BatchStats(total=len(jobs))
+    finished: Dict[int, EpisodeResult] = {}
+    outputs = []
+    # spawned workers share no threads, locks or connections with the parent
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        results = manager.Queue()
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+            futures = [
+                pool.submit(
+                    work,
+                    WorkerConfig(
+                        worker=worker,
+                        scenario_name=scenario_name,
+                        jobs=shard,
+                        setups={problem_index: setups[problem_index] for _, problem_index, _ in shard},
+                        concurrency=concurrency,
+                        max_iters=max_iters,
+                        settings=settings,
+                        dataset=dataset,
+                        chat_speaker=chat_speaker,
+                        cache=cache,
+                        rate_limit_share=1 / len(shards) if rate_limit else None,
+                    ),
+                    results,
+                )
+                for worker, shard in enumerate(shards)
+            ]
+
+            def collect(timeout: float) -> None:
+                try:
+                    result = results.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                finished[result.index] = result
+                stats.add(result)
+                if progress is not None:
+                    progress(stats)
+
+            while not all(future.done() for future in futures):
+                collect(0.2)
+            while not results.empty():
+                collect(0)
+
+            for future, shard in zip(futures, shards):
+                try:
+                    outputs.append(future.result())
+                except Exception:
+                    # a crashed worker fails the episodes it did not report
+                    error = traceback.format_exc()
+                    for index, _, problem in shard:
+                        if index not in finished:
+                            finished[index] = EpisodeResult(index, problem, error=error)
+                            stats.add(finished[index])
+
+    if instrumentation is not None:
+        for output in outputs:
+            instrumentation.merge(output["totals"])
+    report = BatchReport(stats, [finished[index] for index in sorted(finished)])
+
+    if dataset is not None:
+        os.makedirs(dataset, exist_ok=True)
+        write_manifest(
+            os.path.join(dataset, "manifest.json"),
+            {
+                "scenario": scenario_name,
+                "settings": settings or {},
+                "stats": stats.to_dict(),
+                "workers": [{"worker": output["worker"], **output["stats"]} for output in outputs],
+                "shards": [{"worker": output["worker"], **shard} for output in outputs for shard in output["shards"]],
+                "failed_episodes": [episode.index for episode in report.failures],
+            },
+        )
+    return report
@@ -0,0 +1,135 @@
+"""
+Microbenchmarks of the simulator core, run on FakeChatModel so they cost
+nothing and are repeatable:
+
+    python benchmarks/bench_simulator.py --output benchmarks/results.json
+
+- step overhead: time a step spends outside the model call, early
+  and late in a long debate, so history rendering that grows with the
+  transcript shows up as a rising late/early ratio
+- memory: traced allocations after a run, over turn count and agent count
+- prompt size: characters sent per call as the debate goes on, with and
+  without a ContextPolicy
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import List, Optional
+
+from langchain_core.messages import SystemMessage
+
+from autodebate import ContextPolicy, DialogueAgent, DialogueSimulator, Instrumentation
+from autodebate.fake_llm import FakeChatModel
+
+
+def build(
+    agent_count: int,
+    words: int = 50,
+    context_policy: Optional[ContextPolicy] = None,
+    instrumentation: Optional[Instrumentation] = None,
+) -> DialogueSimulator:
+    agents = [
+        DialogueAgent(
+            name=f"Agent {i}",
+            system_message=SystemMessage(content=f"You are Agent {i}. Keep it short."),
+            model=FakeChatModel(words=words, seed=i),
+            context_policy=context_policy,
+            instrumentation=instrumentation,
+        )
+        for i in range(agent_count)
+    ]
+    simulator = DialogueSimulator(agents, lambda step, agents: step % len(agents))
+    simulator.inject("Moderator", "Let us begin.")
+    return simulator
+
+
+def bench_step_overhead(turns: int, agent_count: int = 4) -> dict:
+    instrumentation = Instrumentation()
+    simulator = build(agent_count, instrumentation=instrumentation)
+    overheads = []
+    for _ in range(turns):
+        calls = len(instrumentation.records)
+        started = time.perf_counter()
+        simulator.step()
+        elapsed = time.perf_counter() - started
+        model_time = sum(record.wall_time for record in instrumentation.records[calls:])
+        overheads.append(elapsed - model_time)
+
+    window = max(1, turns // 10)
+    early = statistics.mean(overheads[:window])
+    late = statistics.mean(overheads[-window:])
+    return {
+        "turns": turns,
+        "agents": agent_count,
+        "mean_us": statistics.mean(overheads) * 1e6,
+        "p50_us": statistics.median(overheads) * 1e6,
+        "p95_us": sorted(overheads)[int(len(overheads) * 0.95) - 1] * 1e6,
+        "early_mean_us": early * 1e6,
+        "late_mean_us": late * 1e6,
+        "late_over_early": late / early,
+    }
+
+
+def bench_memory(turn_counts: List[int], agent_counts: List[int]) -> List[dict]:
+    results = []
+    for agent_count in agent_counts:
+        for turns in turn_counts:
+            tracemalloc.start()
+            simulator = build(agent_count)
+            for _ in range(turns):
+                simulator.step()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append(
+                {
+                    "agents": agent_count,
+                    "turns": turns,
+                    "current_kib": current / 1024,
+                    "peak_kib": peak / 1024,
+                    "transcript_kib": sum(len(line) for line in simulator.transcript.lines) / 1024,
+                }
+            )
+    return results
+
+
+def bench_prompt_size(turns: int, sample_every: int) -> dict:
+    results = {}
+    for label, policy in [("full_history", None), ("context_policy", ContextPolicy(model=FakeChatModel(words=30)))]:
+        simulator = build(4, context_policy=policy)
+        samples = []
+        for turn in range(turns):
+            if turn % sample_every == 0:
+                speaker = simulator.agents[simulator.select_next_speaker(simulator._step, simulator.agents)]
+                prompt = speaker.system_message.content + speaker.render()
+                samples.append({"turn": turn, "prompt_chars": len(prompt)})
+            simulator.step()
+        results[label] = samples
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description="Benchmark the simulator core on a fake chat model.")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--output", default="benchmarks/results.json")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "step_overhead": bench_step_overhead(args.turns),
+        "memory": bench_memory([args.turns // 5, args.turns], [2, 4, 8, 16]),
+        "prompt_size": bench_prompt_size(args.turns, max(1, args.turns // 10)),
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results["step_overhead"], indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import gzip
+import os
+
+from autodebate.dataset import PARTIAL, DatasetWriter, read_records, valid_length
+
+
+def write_partial(writer: DatasetWriter, records: list, tail: bytes = b"") -> str:
+    """
+    Leaves a shard open as a crashed writer would, with {tail} cut short after {records}
+    """
+    for record in records:
+        writer.write(record)
+    if writer._file is None:
+        writer._open()
+    writer._file.write(tail)
+    writer._file.flush()
+    path = writer._path + PARTIAL
+    # the process dies: its lock goes, the partial stays
+    writer._file.close()
+    writer._file = None
+    return path
+
+
+def test_valid_length_drops_a_torn_record(tmp_path):
+    writer = DatasetWriter(str(tmp_path))
+    path = write_partial(writer, [{"episode": 0}, {"episode": 1}])
+    complete = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(gzip.compress(b'{"episode": 2}\n')[:-6])
+    assert valid_length(path, compress=True) == complete
+
+
+def test_valid_length_uncompressed(tmp_path):
+    path = tmp_path / "shard.jsonl"
+    path.write_bytes(b'{"episode": 0}\n{"epis')
+    assert valid_length(str(path), compress=False) == len(b'{"episode": 0}\n')
+
+
+def test_recover_closes_crashed_shards(tmp_path):
+    crashed = DatasetWriter(str(tmp_path))
+    write_partial(crashed, [{"episode": 0}, {"episode": 1}], tail=b"\x1f\x8b\x08garbage")
+
+    writer = DatasetWriter(str(tmp_path))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(PARTIAL)]
+    assert [list(read_records(path)) for path in writer.shards()] == [[{"episode": 0}, {"episode": 1}]]
+    # new shards continue after the recovered one
+    writer.write({"episode": 2})
+    writer.close()
+    assert [writer.shard_index(path) for path in writer.shards()] == [0, 1]
+
+
+def test_recover_removes_empty_shards(tmp_path):
+    crashed = DatasetWriter(str(tmp_path))
+    write_partial(crashed, [], tail=b"\x1f\x8b")
+    writer = DatasetWriter(str(tmp_path))
+    assert os.listdir(tmp_path) == []
+    assert writer.shards() == []
+
+
+def test_recover_leaves_live_shards_alone(tmp_path):
+    first = DatasetWriter(str(tmp_path))
+    first.write({"writer": 1})
+    second = DatasetWriter(str(tmp_path))
+    second.write({"writer": 2})
+    # the first writer's shard is still open and its own
+    first.write({"writer": 1})
+    first.close()
+    second.close()
+    assert sorted((list(read_records(path)) for path in first.shards()), key=len, reverse=True) == [
+        [{"writer": 1}, {"writer": 1}],
+        [{"writer": 2}],
+    ]
+
+
+def test_rotation(tmp_path):
+    with DatasetWriter(str(tmp_path), max_shard_bytes=1, compress=False) as writer:
+        for episode in range(3):
+            writer.write({"episode": episode})
+    assert [list(read_records(path)) for path in writer.shards()] == [[{"episode": n}] for n in range(3)]
+    assert [shard["episodes"] for shard in writer.closed] == [1, 1, 1]
@@ -0,0 +1,68 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import SystemMessage
+
+from autodebate.agents import DialogueAgent
+from autodebate.guards import OutputGuard
+from autodebate.instrumentation import Instrumentation
+
+OTHERS = ["Student", "Teacher 1"]
+
+
+@pytest.mark.parametrize(
+    "message, trimmed",
+    [
+        ("Isolate c first.", None),
+        ("Good.\nStudent: so r = 4", "Good."),
+        ("Good.\n  Teacher 1: agreed", "Good."),
+        ("Student: I think r = 4\nTeacher 1: yes", "I think r = 4"),
+        ("Student:", ""),
+        # addressing someone is not speaking as them
+        ("Try again. Student: compute c next", None),
+        ("Ask the Student: what now?", None),
+    ],
+)
+def test_trim(message, trimmed):
+    assert OutputGuard(OTHERS).trim(message) == trimmed
+
+
+def test_model_settings():
+    guard = OutputGuard(["A", "B", "C", "D", "E"], max_tokens=100)
+    assert guard.model_settings() == {"stop": ["\nA:", "\nB:", "\nC:", "\nD:"], "max_tokens": 100}
+
+
+def test_held_back():
+    guard = OutputGuard(OTHERS)
+    assert guard.held_back("Good.\nStu") == 3
+    assert guard.held_back("Good. Stu") == 0
+    assert guard.held_back("Good.\nStop") == 0
+
+
+def agent(reply: str) -> DialogueAgent:
+    return DialogueAgent(
+        "Teacher 2",
+        SystemMessage(content="You teach."),
+        FakeListChatModel(responses=[reply]),
+        instrumentation=Instrumentation(),
+        guard=OutputGuard(OTHERS),
+    )
+
+
+@pytest.mark.parametrize(
+    "reply, sent",
+    [
+        ("Isolate c first.", "Isolate c first."),
+        ("Good.\nStudent: so r = 4", "Good."),
+        ("Student: I think r = 4\nTeacher 1: yes", "I think r = 4"),
+        ("Try again. Student: compute c next", "Try again. Student: compute c next"),
+    ],
+)
+def test_send_and_stream_agree(reply, sent):
+    sending = agent(reply)
+    assert sending.send() == sent
+    # the fake model streams a character at a time
+    streaming = agent(reply)
+    assert "".join(streaming.send_stream()) == sent
+    assert sending.spoke_as_other == streaming.spoke_as_other == (sent != reply)
+    trims = {("Teacher 2", "guard_role_trim"): 1} if sent != reply else {}
+    assert sending.instrumentation.events == streaming.instrumentation.events == trims
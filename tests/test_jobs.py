@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from autodebate import jobs
+from autodebate.dataset import DatasetWriter, read_records
+from autodebate.jobs import EpisodeJob, SQLiteJobStore, awork
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(jobs.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite"), lease_seconds=60, max_attempts=2)
+
+
+def test_claim_leases_each_job_once(store):
+    store.put([EpisodeJob("data-lab", seed=seed) for seed in range(3)])
+    first = store.claim("a", count=2)
+    second = store.claim("b", count=2)
+    assert [job.seed for job in first] == [0, 1]
+    assert [job.seed for job in second] == [2]
+    assert store.claim("c") == []
+    assert store.counts() == {"leased": 3}
+
+
+def test_expired_lease_is_requeued(store, clock):
+    (job_id,) = store.put([EpisodeJob("data-lab")])
+    store.claim("a")
+    clock.now += 30
+    assert store.claim("b") == []
+    clock.now += 31
+    (job,) = store.claim("b")
+    assert job.id == job_id and job.attempts == 2
+    # the first worker lost its lease
+    assert store.renew("a", [job_id]) == []
+    assert not store.finish("a", job_id)
+    assert store.finish("b", job_id)
+    assert store.counts() == {"done": 1}
+
+
+def test_renew_keeps_the_lease(store, clock):
+    (job_id,) = store.put([EpisodeJob("data-lab")])
+    store.claim("a")
+    clock.now += 50
+    assert store.renew("a", [job_id]) == [job_id]
+    clock.now += 50
+    assert store.claim("b") == []
+
+
+def test_max_attempts(store, clock):
+    (job_id,) = store.put([EpisodeJob("data-lab")])
+    store.claim("a")
+    assert store.finish("a", job_id, error="boom")
+    store.claim("a")
+    clock.now += 61
+    # the second lease ran out too, two attempts are all it gets
+    assert store.claim("a") == []
+    assert store.counts() == {"failed": 1}
+
+
+def test_enqueue_seeds_continue(store):
+    store.enqueue("data-lab", episodes=2)
+    store.enqueue("data-lab", episodes=2)
+    store.enqueue("data-lab", episodes=1, seed=100)
+    store.enqueue("data-lab", episodes=1, seeded=False)
+    assert [job.seed for job in store.claim("a", count=10)] == [0, 1, 2, 3, 100, None]
+
+
+def test_awork_runs_every_job(store, tmp_path, monkeypatch):
+    monkeypatch.setenv("AUTODEBATE_FAKE_LLM", "1")
+    store.enqueue("data-lab", episodes=2, max_iters=2)
+    with DatasetWriter(str(tmp_path / "dataset")) as dataset:
+        report = asyncio.run(awork(store, worker="a", concurrency=2, dataset=dataset))
+    assert report.stats.completed == 2
+    assert store.counts() == {"done": 2}
+    records = [record for path in dataset.shards() for record in read_records(path)]
+    assert sorted(record["seed"] for record in records) == [0, 1]
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from autodebate import rate_limit
+from autodebate.rate_limit import ModelLimiter, RateLimiter, Reservation, TokenBucket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_waits_for_its_debt(clock):
+    # 1 per second, 10 of burst
+    bucket = TokenBucket(60)
+    assert bucket.reserve(10) == (0.0, 10)
+    assert bucket.reserve(2) == (2.0, 2)
+    clock.now += 2
+    assert bucket.reserve(1) == (1.0, 1)
+
+
+def test_bucket_takes_at_most_its_capacity(clock):
+    bucket = TokenBucket(60)
+    wait, taken = bucket.reserve(25)
+    assert taken == 10 and wait == 0.0
+    bucket.refund(taken)
+    assert bucket.tokens == 10
+
+
+def test_refund_returns_only_what_was_taken(clock):
+    limiter = RateLimiter(limits={"gpt-4": (1000, 600)})
+    model = limiter.model("gpt-4")
+    reservation = Reservation("gpt-4", 400)
+    model.reserve(reservation)
+    assert reservation.taken == 100
+    model.enter(reservation)
+
+    class Message:
+        usage_metadata = {"input_tokens": 60, "output_tokens": 20}
+
+    limiter._finish(model, reservation, Message())
+    assert model.tokens.tokens == 100 - 80
+
+
+def enter(limiter: ModelLimiter) -> Reservation:
+    reservation = Reservation("gpt-4", 0)
+    limiter.enter(reservation)
+    return reservation
+
+
+def test_throttle_burst_halves_once(clock):
+    limiter = ModelLimiter(None, None, 8, 64)
+    burst = [enter(limiter) for _ in range(8)]
+    clock.now += 1
+    for reservation in burst:
+        limiter.leave(reservation, throttled=True)
+    assert limiter.concurrency == 4
+    # a call entered after the decrease is a new burst
+    clock.now += 1
+    limiter.leave(enter(limiter), throttled=True)
+    assert limiter.concurrency == 2
+    assert limiter.in_flight == 0
+
+
+def test_success_grows_by_one_per_window(clock):
+    limiter = ModelLimiter(None, None, 4, 64)
+    for _ in range(4):
+        limiter.leave(enter(limiter), throttled=False)
+    assert 4.9 < limiter.concurrency < 5.1
+
+
+def test_async_waiter_is_woken_by_leave():
+    async def run() -> int:
+        limiter = ModelLimiter(None, None, 1, 1)
+        first = Reservation("gpt-4", 0)
+        await limiter.aenter(first)
+        second = asyncio.ensure_future(limiter.aenter(Reservation("gpt-4", 0)))
+        await asyncio.sleep(0.01)
+        assert not second.done()
+        limiter.leave(first, throttled=False)
+        await asyncio.wait_for(second, 1)
+        return limiter.in_flight
+
+    assert asyncio.run(run()) == 1
+
+
+def test_call_retries_throttled_failures(monkeypatch):
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda seconds: None)
+
+    class RateLimitError(Exception):
+        pass
+
+    attempts = []
+
+    def send(messages):
+        attempts.append(messages)
+        if len(attempts) < 3:
+            raise RateLimitError()
+        return "reply"
+
+    limiter = RateLimiter(limits={})
+    assert limiter.call(object(), [], send) == "reply"
+    assert limiter.retries == 2 and limiter.throttled == 2
@@ -0,0 +1,57 @@
+from fractions import Fraction
+
+import pytest
+
+from autodebate.verifier import LinearSystemVerifier, claimed_value, parse_linear_system, solve_linear_system
+
+PROBLEM = "Solve -42*r + 27*c = -1167 and 130*r + 4*c = 372 for r."
+
+
+def test_parse_linear_system():
+    assert parse_linear_system(PROBLEM) == [
+        ({"r": Fraction(-42), "c": Fraction(27)}, Fraction(-1167)),
+        ({"r": Fraction(130), "c": Fraction(4)}, Fraction(372)),
+    ]
+
+
+def test_solve_linear_system():
+    assert solve_linear_system(parse_linear_system(PROBLEM)) == {"r": Fraction(4), "c": Fraction(-37)}
+
+
+def test_solve_underdetermined():
+    with pytest.raises(ValueError):
+        solve_linear_system(parse_linear_system("r + c = 3"))
+
+
+@pytest.mark.parametrize(
+    "message, value",
+    [
+        ("So r = 4.", Fraction(4)),
+        ("r is -3/2", Fraction(-3, 2)),
+        ("r equals 2.5", Fraction(5, 2)),
+        ("r: 4", Fraction(4)),
+        ("The answer is **r = 4**.", Fraction(4)),
+        ("**r** = 4", Fraction(4)),
+        ("r = **4**", Fraction(4)),
+        ("_r = 4_", Fraction(4)),
+        ("First r = 3, no wait, r = 4", Fraction(4)),
+        ("r = (372 - 4c)/130", None),
+        ("r = 4*c", None),
+        ("r = 4 * 3", None),
+        ("**r = 4** * 3", None),
+        ("r = 2**2", None),
+        ("r = 4c", None),
+        ("for = 4", None),
+        ("no claim here", None),
+    ],
+)
+def test_claimed_value(message, value):
+    assert claimed_value(message, "r") == value
+
+
+def test_verifier():
+    verifier = LinearSystemVerifier(PROBLEM, "r", speaker="Student")
+    assert verifier("Student", "I get **r = 4**") is True
+    assert verifier("Student", "r: 5") is False
+    assert verifier("Student", "let me think") is None
+    assert verifier("Teacher", "r = 4") is None